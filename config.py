@@ -4,6 +4,7 @@ Configuration file for TikTok Shop scraper
 """
 
 import os
+import functools
 from dataclasses import dataclass
 from typing import Dict, List
 
@@ -163,9 +164,15 @@ PRODUCTION_CONFIG.MAX_PRODUCTS_PER_MARKET = 50
 PRODUCTION_CONFIG.MIN_DELAY = 3.0
 PRODUCTION_CONFIG.MAX_DELAY = 8.0
 
-# Get configuration based on environment
+# Get configuration based on environment (resolved once per process)
+@functools.lru_cache(maxsize=1)
 def get_config():
     env = os.getenv('ENVIRONMENT', 'development').lower()
     if env == 'production':
         return PRODUCTION_CONFIG
     return DEVELOPMENT_CONFIG
+
+
+def _reset_config_cache():
+    """Forget the cached configuration so ENVIRONMENT is read again (for tests)"""
+    get_config.cache_clear()
@@ -3,13 +3,16 @@
 Test cases for TikTok Shop Reviews Scraper
 """
 
+import os
+import json
 import unittest
 import time
 from unittest.mock import Mock, patch, MagicMock
 from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
 
 from tiktok_shop_scraper import TikTokShopScraper, ProductInfo, ReviewInfo
-from config import get_config
+from config import get_config, _reset_config_cache, PRODUCTION_CONFIG
 from utils import clean_text, normalize_rating, validate_review_data, deduplicate_reviews
 
 
@@ -96,6 +99,23 @@ class TestUtilityFunctions(unittest.TestCase):
         
         unique_reviews = deduplicate_reviews(reviews)
         self.assertEqual(len(unique_reviews), 2)
+        
+        # First occurrences are kept in their original order
+        self.assertIs(unique_reviews[0], reviews[0])
+        self.assertIs(unique_reviews[1], reviews[2])
+
+    def test_checkpoint_round_trip(self):
+        """Test checkpoints keep non-ASCII review text when saved and reloaded"""
+        import tempfile
+        from utils import save_checkpoint, load_checkpoint
+
+        data = [{'review_text': 'Sản phẩm rất tốt', 'rating': '5'}]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'checkpoint.json')
+            save_checkpoint(data, path)
+            with open(path, encoding='utf-8') as f:
+                self.assertIn('Sản phẩm rất tốt', f.read())
+            self.assertEqual(load_checkpoint(path), data)
 
 
 class TestScraperConfiguration(unittest.TestCase):
@@ -112,6 +132,17 @@ class TestScraperConfiguration(unittest.TestCase):
         self.assertIsInstance(config.USER_AGENTS, list)
         self.assertGreater(len(config.USER_AGENTS), 0)
     
+    def test_config_is_cached(self):
+        """Test that configuration is resolved once and can be reset"""
+        self.assertIs(get_config(), get_config())
+        
+        with patch.dict('os.environ', {'ENVIRONMENT': 'production'}):
+            _reset_config_cache()
+            try:
+                self.assertIs(get_config(), PRODUCTION_CONFIG)
+            finally:
+                _reset_config_cache()
+    
     def test_market_configuration(self):
         """Test market-specific configuration"""
         config = get_config()
@@ -130,9 +161,10 @@ class TestScraperConfiguration(unittest.TestCase):
 class TestScraperCore(unittest.TestCase):
     """Test core scraper functionality"""
     
-    def setUp(self):
-        """Setup test environment"""
-        self.scraper = TikTokShopScraper(headless=True)
+    @classmethod
+    def setUpClass(cls):
+        """Setup test environment shared by all tests in the class"""
+        cls.scraper = TikTokShopScraper(headless=True)
     
     def test_scraper_initialization(self):
         """Test scraper initialization"""
@@ -163,7 +195,21 @@ class TestScraperCore(unittest.TestCase):
         self.assertGreaterEqual(delay, 0.1)
         self.assertLessEqual(delay, 0.3)  # Allow some tolerance
     
-    @patch('tiktok_shop_scraper._MODULE.webdriver.Chrome')
+    def test_dataclasses_are_slotted(self):
+        """Test that result records keep one slot per field, no __dict__, and stay immutable"""
+        import pickle
+        from dataclasses import fields, FrozenInstanceError
+
+        for cls in (ProductInfo, ReviewInfo):
+            self.assertEqual(list(cls.__slots__), [field.name for field in fields(cls)])
+            record = cls(*[str(i) for i in range(len(cls.__slots__))])
+            self.assertFalse(hasattr(record, '__dict__'))
+            with self.assertRaises(FrozenInstanceError):
+                setattr(record, cls.__slots__[0], 'changed')
+            self.assertEqual(pickle.loads(pickle.dumps(record)), record)
+            self.assertEqual(hash(record), hash(cls(*[str(i) for i in range(len(cls.__slots__))])))
+    
+    @patch('selenium.webdriver.Chrome')
     def test_setup_driver(self, mock_chrome):
         """Test driver setup"""
         mock_driver = Mock()
@@ -171,19 +217,201 @@ class TestScraperCore(unittest.TestCase):
         
         driver = self.scraper.setup_driver('vietnam')
         
-        # Verify Chrome was called
+        # Verify Chrome was called with a keep-alive command connection
         mock_chrome.assert_called_once()
+        self.assertIs(mock_chrome.call_args.kwargs['keep_alive'], True)
+        self.assertIs(driver.command_executor.keep_alive, True)
+        options = mock_chrome.call_args.kwargs['options']
+        self.assertEqual(options.page_load_strategy, 'eager')
+        for flag in TikTokShopScraper.LEAN_CHROME_FLAGS:
+            self.assertIn(flag, options.arguments)
+        self.assertIn('--headless=new', options.arguments)
+        prefs = options.experimental_options['prefs']
+        self.assertEqual(prefs['profile.managed_default_content_settings.stylesheets'], 2)
+        
+        # Verify the persisted profile is per market and keeps a large disk cache
+        profile_dir = os.path.abspath(os.path.join(self.scraper.session_dir, 'chrome_profile_vietnam'))
+        self.assertIn(f'--user-data-dir={profile_dir}', options.arguments)
+        self.assertIn(f'--disk-cache-size={TikTokShopScraper.DISK_CACHE_SIZE}', options.arguments)
+        self.assertEqual(TikTokShopScraper._driver_profiles[driver], profile_dir)
+        
+        # Verify heavy resources are blocked through CDP
+        mock_driver.execute_cdp_cmd.assert_any_call(
+            "Network.setBlockedURLs", {"urls": TikTokShopScraper.BLOCKED_URL_PATTERNS}
+        )
         
         # Verify anti-detection script was executed
         mock_driver.execute_script.assert_called_once()
+        
+        # An empty block list leaves network interception off
+        mock_chrome.reset_mock()
+        mock_chrome.return_value = Mock()
+        TikTokShopScraper(headless=True, persist_session=False, block_patterns=[]).setup_driver('vietnam')
+        mock_chrome.return_value.execute_cdp_cmd.assert_not_called()
+        TikTokShopScraper._quit_driver(driver)
+
+    def test_widen_command_pool(self):
+        """Test that the driver command pool is resized"""
+        import urllib3
+
+        mock_driver = Mock()
+        mock_driver.command_executor._conn = urllib3.PoolManager()
+
+        self.scraper.widen_command_pool(mock_driver)
+
+        pool_kw = mock_driver.command_executor._conn.connection_pool_kw
+        self.assertEqual(pool_kw['maxsize'], TikTokShopScraper.COMMAND_POOL_MAXSIZE)
+        self.assertFalse(pool_kw['block'])
+
+    @patch('selenium.webdriver.Chrome')
+    def test_driver_pool_reuses_released_driver(self, mock_chrome):
+        """Test that released drivers are lent out again instead of restarted"""
+        mock_driver = Mock()
+        mock_chrome.return_value = mock_driver
+
+        try:
+            with self.scraper.driver_for('vietnam') as driver:
+                self.assertIs(driver, mock_driver)
+            with self.scraper.driver_for('vietnam') as driver:
+                self.assertIs(driver, mock_driver)
+
+            # Only one browser was started and it was reset between leases
+            mock_chrome.assert_called_once()
+            mock_driver.get.assert_called_with('about:blank')
+            mock_driver.quit.assert_not_called()
+        finally:
+            TikTokShopScraper.shutdown_pool()
+
+        mock_driver.quit.assert_called_once()
+
+    @patch('selenium.webdriver.Chrome')
+    def test_driver_pool_separates_sessions(self, mock_chrome):
+        """Test that pooled drivers are not lent to scrapers with another session"""
+        import tempfile
+
+        mock_chrome.side_effect = lambda **kwargs: Mock()
+        with tempfile.TemporaryDirectory() as session_dir:
+            persisted = TikTokShopScraper(headless=True, session_dir=session_dir)
+            other_dir = TikTokShopScraper(headless=True, session_dir=os.path.join(session_dir, 'other'))
+            ephemeral = TikTokShopScraper(headless=True, persist_session=False, session_dir=session_dir)
+            try:
+                with persisted.driver_for('vietnam') as driver:
+                    pass
+                for scraper in (other_dir, ephemeral):
+                    with scraper.driver_for('vietnam') as other:
+                        self.assertIsNot(other, driver)
+                with persisted.driver_for('vietnam') as again:
+                    self.assertIs(again, driver)
+            finally:
+                TikTokShopScraper.shutdown_pool()
+
+    @patch('selenium.webdriver.Chrome')
+    def test_pooled_drivers_get_own_profiles(self, mock_chrome):
+        """Test that live drivers for one market never share a persisted Chrome profile"""
+        import tempfile
+
+        def profile_of(driver_call):
+            args = driver_call.kwargs['options'].arguments
+            return next(arg for arg in args if arg.startswith('--user-data-dir='))
+
+        mock_chrome.side_effect = lambda **kwargs: Mock()
+        with tempfile.TemporaryDirectory() as session_dir:
+            scraper = TikTokShopScraper(headless=True, session_dir=session_dir)
+            base = os.path.abspath(os.path.join(session_dir, 'chrome_profile_vietnam'))
+            try:
+                with scraper.driver_for('vietnam'), scraper.driver_for('vietnam'):
+                    pass
+                self.assertEqual([profile_of(c) for c in mock_chrome.call_args_list],
+                                 [f'--user-data-dir={base}', f'--user-data-dir={base}_2'])
+            finally:
+                TikTokShopScraper.shutdown_pool()
+
+            # Quitting frees the directories for the next drivers
+            scraper.setup_driver('vietnam')
+            self.assertEqual(profile_of(mock_chrome.call_args), f'--user-data-dir={base}')
+            for driver in list(TikTokShopScraper._driver_profiles):
+                TikTokShopScraper._quit_driver(driver)
+
+    @patch('selenium.webdriver.Chrome')
+    def test_driver_kept_across_products(self, mock_chrome):
+        """Test that one driver serves every product in a market until close()"""
+        vietnam_driver, saudi_driver = Mock(), Mock()
+        mock_chrome.side_effect = [vietnam_driver, saudi_driver]
+        scraper = TikTokShopScraper(headless=True)
+
+        try:
+            self.assertIs(scraper._get_or_create_driver('vietnam'), vietnam_driver)
+            self.assertIs(scraper._get_or_create_driver('vietnam'), vietnam_driver)
+            self.assertEqual(mock_chrome.call_count, 1)
+
+            # Switching market hands the old driver back to the pool
+            self.assertIs(scraper._get_or_create_driver('saudi_arabia'), saudi_driver)
+            vietnam_driver.get.assert_called_with('about:blank')
+
+            scraper.close()
+            self.assertIsNone(scraper.driver)
+            saudi_driver.quit.assert_not_called()
+        finally:
+            TikTokShopScraper.shutdown_pool()
+
+    def test_close_waits_for_browser_job(self):
+        """Test that close() never pools a driver a browser job thread is still using"""
+        import threading
+
+        scraper = TikTokShopScraper(headless=True)
+        job_started, job_done = threading.Event(), threading.Event()
+
+        def browser_job():
+            with scraper._browser_lock:
+                job_started.set()
+                job_done.wait(5)
+
+        job = threading.Thread(target=browser_job)
+        try:
+            # The job finishes within the timeout: the driver goes back to the pool afterwards
+            scraper.driver, scraper._driver_market = Mock(), 'vietnam'
+            job.start()
+            job_started.wait(1)
+            with patch.object(scraper, 'release_driver') as mock_release:
+                threading.Timer(0.1, job_done.set).start()
+                scraper.close()
+            mock_release.assert_called_once()
+            job.join(1)
+
+            # The job outlives the timeout: the driver is quit rather than pooled
+            job_started.clear()
+            job_done.clear()
+            job = threading.Thread(target=browser_job)
+            job.start()
+            job_started.wait(1)
+            driver = scraper.driver = Mock()
+            with patch.object(TikTokShopScraper, 'BROWSER_RELEASE_TIMEOUT', 0.1), \
+                    patch.object(scraper, 'release_driver') as mock_release:
+                scraper.close()
+            mock_release.assert_not_called()
+            driver.quit.assert_called_once()
+            self.assertIsNone(scraper.driver)
+        finally:
+            job_done.set()
+            job.join(1)
 
 
 class TestProductExtraction(unittest.TestCase):
     """Test product information extraction"""
     
-    def setUp(self):
-        """Setup test environment"""
-        self.scraper = TikTokShopScraper(headless=True)
+    @classmethod
+    def setUpClass(cls):
+        """Setup test environment shared by all tests in the class"""
+        cls.scraper = TikTokShopScraper(headless=True)
+    
+    def test_is_target_brand(self):
+        """Test brand matching across spellings"""
+        import tiktok_shop_scraper_impl as impl
+
+        self.assertTrue(impl.is_target_brand('LANCÔME Advanced Génifique'))
+        self.assertTrue(impl.is_target_brand('Serum lancome 30ml'))
+        self.assertTrue(impl.is_target_brand('سيروم لانكوم'))
+        self.assertFalse(impl.is_target_brand('Estée Lauder Night Repair'))
     
     def test_extract_product_info(self):
         """Test product information extraction"""
@@ -199,9 +427,11 @@ class TestProductExtraction(unittest.TestCase):
         mock_price_element = Mock()
         mock_price_element.text = '₫1,500,000'
         
-        mock_element.find_element.side_effect = [
-            mock_name_element,  # First call for name
-            mock_price_element  # Second call for price
+        mock_element.find_elements.side_effect = [
+            [mock_name_element],  # First call for name
+            [mock_price_element],  # Second call for price
+            [],  # No rating
+            []  # No review count
         ]
         
         product = self.scraper.extract_product_info(mock_element, 'vietnam')
@@ -210,15 +440,18 @@ class TestProductExtraction(unittest.TestCase):
         self.assertEqual(product.name, 'Lancôme Advanced Génifique')
         self.assertEqual(product.price, '₫1,500,000')
         self.assertEqual(product.market, 'vietnam')
+        self.assertEqual(product.rating, 'N/A')
+        mock_element.find_elements.assert_any_call(By.CSS_SELECTOR, TikTokShopScraper.PRODUCT_NAME_SELECTOR)
 
 
 class TestReviewExtraction(unittest.TestCase):
     """Test review extraction functionality"""
     
-    def setUp(self):
-        """Setup test environment"""
-        self.scraper = TikTokShopScraper(headless=True)
-        self.sample_product = ProductInfo(
+    @classmethod
+    def setUpClass(cls):
+        """Setup test environment shared by all tests in the class"""
+        cls.scraper = TikTokShopScraper(headless=True)
+        cls.sample_product = ProductInfo(
             url='https://shop.tiktok.com/vn/product/123',
             name='Lancôme Test Product',
             price='₫1,000,000',
@@ -233,61 +466,578 @@ class TestReviewExtraction(unittest.TestCase):
         # Create mock review element
         mock_element = Mock()
         
-        # Mock sub-elements
-        mock_reviewer = Mock()
-        mock_reviewer.text = 'TestUser123'
-        
-        mock_rating = Mock()
-        mock_rating.get_attribute.return_value = '5'
-        mock_rating.text = '5 stars'
-        
-        mock_text = Mock()
-        mock_text.text = 'This is an amazing product! Highly recommend.'
-        
-        mock_date = Mock()
-        mock_date.text = '2024-08-15'
-        
-        mock_helpful = Mock()
-        mock_helpful.text = '12'
-        
-        # Setup find_element to return appropriate mocks
-        def mock_find_element(by, selector):
-            if 'reviewer-name' in selector or 'username' in selector:
-                return mock_reviewer
-            elif 'rating' in selector or 'star' in selector:
-                return mock_rating
-            elif 'review-text' in selector or 'comment-text' in selector:
-                return mock_text
-            elif 'review-date' in selector or 'timestamp' in selector:
-                return mock_date
-            elif 'helpful' in selector or 'likes' in selector:
-                return mock_helpful
-            else:
-                raise Exception("Element not found")
-        
-        mock_element.find_element.side_effect = mock_find_element
+        # All fields come back from one script call; unmatched fields are None
+        scraper = TikTokShopScraper(headless=True)
+        scraper.driver = Mock()
+        scraper.driver.execute_script.return_value = {
+            'reviewer_name': 'TestUser123',
+            'rating': '5',
+            'review_text': 'This is an amazing product! Highly recommend.',
+            'review_date': '2024-08-15',
+            'helpful_votes': None,
+        }
         
-        review = self.scraper.extract_review_info(mock_element, self.sample_product)
+        review = scraper.extract_review_info(mock_element, self.sample_product)
         
+        scraper.driver.execute_script.assert_called_once_with(
+            TikTokShopScraper.REVIEW_FIELDS_JS, mock_element, TikTokShopScraper.REVIEW_FIELD_QUERIES
+        )
+        mock_element.find_element.assert_not_called()
+        self.assertEqual(review.helpful_votes, '0')
         self.assertIsInstance(review, ReviewInfo)
         self.assertEqual(review.reviewer_name, 'TestUser123')
         self.assertEqual(review.rating, '5')
         self.assertEqual(review.review_text, 'This is an amazing product! Highly recommend.')
         self.assertEqual(review.product_name, 'Lancôme Test Product')
+        
+        # IDs come from a fixed hash of the content, not the per-process hash()
+        self.assertEqual(review.review_id, 'c2b95e1e2e54480e')
+
+    def test_extract_review_info_fallback(self):
+        """Test fallback extraction works on pre-fetched element text"""
+        review = self.scraper.extract_review_info_fallback(
+            'FallbackUser\n  Loved the texture, absorbs quickly.  \n5', self.sample_product, '2024-08-21T10:00:00'
+        )
+        
+        self.assertEqual(review.reviewer_name, 'FallbackUser')
+        self.assertEqual(review.review_text, 'Loved the texture, absorbs quickly.')
+        self.assertEqual(review.scrape_timestamp, '2024-08-21T10:00:00')
+        self.assertIsNone(self.scraper.extract_review_info_fallback('too short', self.sample_product))
+
+    def test_selector_probes_use_one_round_trip(self):
+        """Test that selector probing runs as a single script call"""
+        import tempfile
+
+        scraper = TikTokShopScraper(headless=True)
+        scraper.driver = Mock()
+        first, second = Mock(), Mock()
+        scraper.driver.execute_script.return_value = [first, second]
+
+        self.assertEqual(scraper.find_review_elements(), [first, second])
+        scraper.driver.execute_script.assert_called_once_with(
+            TikTokShopScraper.ALL_MATCHES_JS, TikTokShopScraper.REVIEW_ELEMENT_SELECTORS
+        )
+        scraper.driver.find_elements.assert_not_called()
+
+        scraper.driver.execute_script.reset_mock()
+        scraper.driver.execute_script.return_value = list(range(len(TikTokShopScraper.PROBE_SELECTORS)))
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, 'probe.json')
+            scraper.save_selector_probe_report(filename)
+            with open(filename, encoding='utf-8') as f:
+                report = json.load(f)
+            # Written through a temp file that is renamed into place
+            self.assertEqual(os.listdir(tmp), ['probe.json'])
+        scraper.driver.execute_script.assert_called_once()
+        self.assertEqual(report['#reviews'], len(TikTokShopScraper.PROBE_SELECTORS) - 1)
+
+    def test_find_review_info_node(self):
+        """Test review_info lookup skips empty nodes and survives deep nesting"""
+        payload = {'a': [{'review_info': {}}, {'b': {'review_info': {'reviews': [1]}}}]}
+        self.assertEqual(self.scraper.find_review_info_node(payload), {'reviews': [1]})
+
+        deep = {'review_info': {'reviews': [2]}}
+        for _ in range(5000):
+            deep = {'child': [deep]}
+        self.assertEqual(self.scraper.find_review_info_node(deep), {'reviews': [2]})
+        self.assertIsNone(self.scraper.find_review_info_node({'a': [1, 'x', None]}))
+
+        # The first match in document order wins, as with a recursive walk
+        ordered = {'main': {'review_info': {'reviews': ['main']}},
+                   'recommend': [{'review_info': {'reviews': ['other']}}]}
+        self.assertEqual(self.scraper.find_review_info_node(ordered), {'reviews': ['main']})
+        listed = [{'review_info': {'reviews': ['first']}}, {'review_info': {'reviews': ['second']}}]
+        self.assertEqual(self.scraper.find_review_info_node(listed), {'reviews': ['first']})
+
+    def test_router_reviews_share_repeated_strings(self):
+        """Test that per-product strings are shared across parsed reviews and \r\n is normalised"""
+        items = [
+            {'review_text': text, 'product_name': ''.join(['Lancôme ', 'Idôle']), 'review_rating': 5}
+            for text in ('First', 'Second')
+        ]
+        script = json.dumps({'review_info': {'product_reviews': items}})
+        first, second = self.scraper.parse_router_data_reviews(script, self.sample_product)
+
+        self.assertIs(first.product_name, second.product_name)
+        self.assertIs(first.rating, second.rating)
+        self.assertIs(first.country_market, second.country_market)
+
+        item = {'review_text': 'Line one\r\nLine two'}
+        script = json.dumps({'review_info': {'product_reviews': [item]}})
+        review, = self.scraper.parse_router_data_reviews(script, self.sample_product)
+        self.assertEqual(review.review_text, 'Line one\nLine two')
+        self.assertEqual(first.country_market, self.sample_product.market)
+
+    def test_generated_router_review_builder(self):
+        """Test the compiled builder matches the dataclass constructor field for field"""
+        import tiktok_shop_scraper_impl as impl
+
+        node = {'reviewer_name': 'Linh', 'review_rating': 4, 'is_verified_purchase': True}
+        review = impl.build_router_review(node, 'url', 'name', 'vietnam', 'text', 'date', 'id1', 'ts')
+        self.assertEqual(review, ReviewInfo(
+            product_url='url', product_name='name', reviewer_name='Linh', rating='4', review_text='text',
+            review_date='date', verified_purchase='Yes', helpful_votes='0', review_id='id1',
+            country_market='vietnam', scrape_timestamp='ts'
+        ))
+        self.assertFalse(hasattr(review, '__dict__'))
+
+        # Non-string JSON values still become str fields
+        review = impl.build_router_review({'reviewer_name': 12345}, 'url', 'name', 'vietnam', 'text', 'date', 'id1', 'ts')
+        self.assertEqual(review.reviewer_name, '12345')
+
+        with self.assertRaises(ValueError):
+            impl.compile_review_builder({'product_url': 'url'}, ('url',))
+
+
+class TestHttpScraping(unittest.TestCase):
+    """Test the HTTP/async fetch path, page cache and product discovery"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Setup test environment shared by all tests in the class"""
+        cls.scraper = TikTokShopScraper(headless=True)
+        cls.sample_product = ProductInfo(
+            url='https://shop.tiktok.com/vn/product/123',
+            name='Lancôme Test Product',
+            price='₫1,000,000',
+            rating='4.5',
+            review_count='100',
+            brand='Lancôme',
+            market='vietnam'
+        )
+    
+    def test_http_fetch_reviews(self):
+        """Test review extraction from a product page fetched over HTTP"""
+        router_data = {
+            'loaderData': {
+                'page': {
+                    'review_info': {
+                        'product_reviews': [
+                            {
+                                'review_id': '7001',
+                                'reviewer_name': 'HttpUser',
+                                'review_rating': 5,
+                                'review_text': 'Fetched without a browser.',
+                                'review_time': '1723680000000',
+                                'is_verified_purchase': True
+                            }
+                        ]
+                    }
+                }
+            }
+        }
+        html = (
+            '<html><body><script id="__MODERN_ROUTER_DATA__" type="application/json">'
+            f'{json.dumps(router_data)}</script></body></html>'
+        )
+        scraper = TikTokShopScraper(headless=True, persist_session=False, cache_max_age=None)
+        response = Mock(text=html)
+
+        with patch.object(scraper.session, 'get', return_value=response) as mock_get:
+            reviews = scraper._http_fetch_reviews(self.sample_product)
+
+        mock_get.assert_called_once()
+        self.assertEqual(len(reviews), 1)
+        self.assertEqual(reviews[0].review_id, '7001')
+        self.assertEqual(reviews[0].reviewer_name, 'HttpUser')
+        self.assertEqual(reviews[0].verified_purchase, 'Yes')
+
+        # A challenge page without router data yields nothing, so the browser is used
+        response.text = '<html><body>Verify you are human</body></html>'
+        with patch.object(scraper.session, 'get', return_value=response):
+            self.assertEqual(scraper._http_fetch_reviews(self.sample_product), [])
+
+        # The session retries throttled/5xx responses over pooled connections
+        adapter = scraper.session.get_adapter(self.sample_product.url)
+        self.assertEqual(adapter.max_retries.total, TikTokShopScraper.HTTP_RETRIES)
+        self.assertIn(429, adapter.max_retries.status_forcelist)
+        self.assertIn(scraper.session.headers['User-Agent'], scraper.user_agents)
+
+    def test_parse_search_results(self):
+        """Test HTTP product discovery from search router data and plain product links"""
+        cards = {'loaderData': {'search': {'products': [
+            {'product_id': '111', 'title': 'Lancôme Advanced Génifique'},
+            {'product_id': '222', 'title': 'Other Brand Serum'},
+            {'product_id': '333', 'product_name': 'Lancome Idole'},
+        ]}}}
+        html = (
+            f'<html><script id="__MODERN_ROUTER_DATA__">{json.dumps(cards)}</script></html>'
+        )
+        products = self.scraper.parse_search_results(html, 'vietnam')
+        self.assertEqual([p.url for p in products], [
+            'https://shop.tiktok.com/vn/product/111', 'https://shop.tiktok.com/vn/product/333'
+        ])
+        self.assertEqual(products[0].name, 'Lancôme Advanced Génifique')
+
+        links = '<html><a href="/vn/product/444?x=1"><span>Lancôme Absolue</span></a><a href="/vn/product/555">Other</a></html>'
+        products = self.scraper.parse_search_results(links, 'vietnam')
+        self.assertEqual([(p.url, p.name) for p in products],
+                         [('https://shop.tiktok.com/vn/product/444', 'Lancôme Absolue')])
+
+    def test_fetch_reviews_backs_off_on_throttling(self):
+        """Test that 429/5xx responses are retried, honouring Retry-After"""
+        import asyncio
+
+        scraper = TikTokShopScraper(headless=True, persist_session=False, cache_max_age=None)
+        responses = [(429, {'Retry-After': '7'}), (503, {}), (200, {})]
+
+        class FakeResponse:
+            def __init__(self, status, headers):
+                self.status, self.headers = status, headers
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            def raise_for_status(self):
+                pass
+
+            async def text(self):
+                return '<html></html>'
+
+        session = Mock()
+        session.get.side_effect = lambda url: FakeResponse(*responses.pop(0))
+        sleeps = []
+
+        async def fake_sleep(delay):
+            sleeps.append(delay)
+
+        with patch('tiktok_shop_scraper_impl.asyncio.sleep', side_effect=fake_sleep), \
+                patch.object(scraper, 'parse_product_page', return_value=(['review'], None)) as mock_parse:
+            reviews = asyncio.run(scraper._fetch_reviews(self.sample_product, session))
+
+        self.assertEqual(reviews, ['review'])
+        mock_parse.assert_called_once_with(self.sample_product, '<html></html>')
+        self.assertEqual(sleeps[0], 7.0)
+        self.assertTrue(2 <= sleeps[1] < 3)
+        self.assertEqual(scraper.backoff_delay(10), scraper.HTTP_MAX_BACKOFF)
+
+    def test_fetch_page_paces_semaphore_slots(self):
+        """Test that a request's slot stays taken for the pacing pause without blocking the caller"""
+        import asyncio
+
+        scraper = TikTokShopScraper(headless=True, persist_session=False, cache_max_age=None)
+        scraper.http_concurrency = 1
+        scraper.HTTP_PACING = (0.01, 0.01)
+        response = MagicMock(status=200)
+        response.__aenter__.return_value = response
+        response.text.return_value = asyncio.sleep(0, result='<html></html>')
+        session = Mock()
+        session.get.return_value = response
+
+        async def fetch_and_check():
+            html = await scraper._fetch_page(self.sample_product.url, session)
+            held = scraper.request_semaphore().locked()
+            await asyncio.sleep(0.05)
+            return html, held, scraper.request_semaphore().locked()
+
+        self.assertEqual(asyncio.run(fetch_and_check()), ('<html></html>', True, False))
+
+    def test_scrape_products_concurrently(self):
+        """Test that HTTP fetches run together and only misses fall back to the browser"""
+        import asyncio
+
+        scraper = TikTokShopScraper(headless=True, persist_session=False, cache_max_age=None)
+        other_product = ProductInfo(
+            url='https://shop.tiktok.com/vn/product/456', name='Lancôme Challenge Page', price='N/A',
+            rating='N/A', review_count='N/A', brand='Lancôme', market='vietnam'
+        )
+        http_review = Mock(name='http_review')
+        browser_review = Mock(name='browser_review')
+        in_flight = []
+
+        async def fake_fetch(product, session):
+            in_flight.append(product.url)
+            await asyncio.sleep(0)
+            # Both requests were started before either finished
+            self.assertEqual(len(in_flight), 2)
+            return [http_review] if product is self.sample_product else []
+
+        with patch.object(scraper, '_fetch_reviews', side_effect=fake_fetch), \
+                patch.object(scraper, 'scrape_product_reviews', return_value=[browser_review]) as mock_browser, \
+                patch.object(scraper, 'random_delay'):
+            emitted = []
+            asyncio.run(scraper._scrape_market_products([self.sample_product, other_product], emitted.extend))
+
+        self.assertEqual(emitted, [http_review, browser_review])
+        mock_browser.assert_called_once_with(other_product, use_http=False)
+
+    def test_failed_product_falls_back_alone(self):
+        """Test that one product raising during the HTTP path doesn't discard the others"""
+        import asyncio
+
+        scraper = TikTokShopScraper(headless=True, persist_session=False, cache_max_age=None, parse_workers=0)
+        products = [
+            ProductInfo(url=f'https://shop.tiktok.com/vn/product/{i}', name=f'Lancôme {i}', price='N/A',
+                        rating='N/A', review_count='N/A', brand='Lancôme', market='vietnam')
+            for i in (1, 2, 3)
+        ]
+        router_data = {'review_info': {'product_reviews': [{'review_text': 'Fine'}]}}
+        html = f'<html><script id="__MODERN_ROUTER_DATA__">{json.dumps(router_data)}</script></html>'
+        browser_review = Mock(name='browser_review')
+
+        async def fake_fetch_page(url, session):
+            if url.endswith('/2'):
+                raise UnicodeDecodeError('utf-8', b'\xff', 0, 1, 'bad charset')
+            return html
+
+        with patch.object(scraper, '_fetch_page', side_effect=fake_fetch_page), \
+                patch.object(scraper, 'scrape_product_reviews', return_value=[browser_review]) as mock_browser, \
+                patch.object(scraper, 'random_delay'):
+            emitted = []
+            asyncio.run(scraper._scrape_market_products(products, emitted.extend, session=Mock()))
+
+        self.assertEqual([r.product_url for r in emitted[:2]], [products[0].url, products[2].url])
+        self.assertIs(emitted[2], browser_review)
+        mock_browser.assert_called_once_with(products[1], use_http=False)
+
+    def test_fetch_reviews_parses_in_worker_process(self):
+        """Test that fetched pages are parsed in the parse pool and still cached by the parent"""
+        import asyncio
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        import tiktok_shop_scraper_impl as impl
+
+        router_data = {'review_info': {'product_reviews': [{'review_id': '9', 'review_text': 'Parsed elsewhere'}]}}
+        html = f'<html><script id="__MODERN_ROUTER_DATA__">{json.dumps(router_data)}</script></html>'
+        scraper = TikTokShopScraper(headless=True, persist_session=False, cache_max_age=None)
+
+        async def fake_fetch_page(url, session):
+            return html
+
+        with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=impl.init_parse_worker) as pool, \
+                patch.object(scraper, '_fetch_page', side_effect=fake_fetch_page), \
+                patch.object(scraper, '_cache_put') as mock_cache_put:
+            scraper._parse_pool = pool
+            reviews = asyncio.run(scraper._fetch_reviews(self.sample_product, None))
+
+        self.assertEqual([(r.review_id, r.review_text) for r in reviews], [('9', 'Parsed elsewhere')])
+        mock_cache_put.assert_called_once_with(self.sample_product.url, html, json.dumps(router_data))
+
+        # Parsing inline still writes the cache off the event loop thread
+        import threading
+        put_threads = []
+        with patch.object(scraper, '_fetch_page', side_effect=fake_fetch_page), \
+                patch.object(scraper, '_cache_put', side_effect=lambda *args: put_threads.append(threading.current_thread())):
+            scraper._parse_pool = None
+            reviews = asyncio.run(scraper._fetch_reviews(self.sample_product, None))
+        self.assertEqual([r.review_id for r in reviews], ['9'])
+        self.assertEqual(len(put_threads), 1)
+        self.assertIsNot(put_threads[0], threading.current_thread())
+
+        # Parse workers log to stderr only and skip the HTTP session
+        with patch('tiktok_shop_scraper_impl.logging.basicConfig') as mock_basic_config, \
+                patch('tiktok_shop_scraper_impl.logging.FileHandler') as mock_file_handler:
+            try:
+                impl.init_parse_worker()
+                worker = impl._worker_scraper
+                self.assertFalse(hasattr(worker, 'session'))
+                self.assertEqual(impl.parse_page_worker(self.sample_product, html)[1], json.dumps(router_data))
+            finally:
+                impl._worker_scraper = None
+        mock_file_handler.assert_not_called()
+        mock_basic_config.assert_called_once()
+
+    def test_page_cache_round_trip(self):
+        """Test that cached pages are reused until they expire"""
+        import tempfile
+
+        with tempfile.TemporaryDirectory() as session_dir:
+            scraper = TikTokShopScraper(headless=True, persist_session=False, session_dir=session_dir)
+            url = self.sample_product.url
+
+            self.assertIsNone(scraper._cache_get(url, 60))
+            scraper._cache_put(url, '<html></html>', '{"review_info": {}}')
+
+            entry = scraper._cache_get(url, 60)
+            self.assertEqual(entry['url'], url)
+            self.assertEqual(entry['payload'], '{"review_info": {}}')
+
+            # Entries older than max_age are ignored
+            old_mtime = time.time() - 120
+            os.utime(scraper._cache_path(url), (old_mtime, old_mtime))
+            self.assertIsNone(scraper._cache_get(url, 60))
+
+
+class TestScrapePipeline(unittest.TestCase):
+    """Test market orchestration, worker processes and hand-off to the writers"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Setup test environment shared by all tests in the class"""
+        cls.scraper = TikTokShopScraper(headless=True)
+        cls.sample_product = ProductInfo(
+            url='https://shop.tiktok.com/vn/product/123',
+            name='Lancôme Test Product',
+            price='₫1,000,000',
+            rating='4.5',
+            review_count='100',
+            brand='Lancôme',
+            market='vietnam'
+        )
+    
+    def test_iter_reviews_scrapes_markets_concurrently(self):
+        """Test that both markets are searched and streamed through iter_reviews"""
+        scraper = TikTokShopScraper(headless=True, persist_session=False, cache_max_age=None)
+        reviews_by_market = {'vietnam': [Mock(name='vn_review')], 'saudi_arabia': [Mock(name='sa_review')]}
+
+        async def fake_scrape_all(products, session=None):
+            return [reviews_by_market[product.market] for product in products]
+
+        async def no_http_results(market, session):
+            return []
+
+        def fake_search(market):
+            return [ProductInfo(
+                url=f'https://shop.tiktok.com/{market}/product/1', name='Lancôme', price='N/A',
+                rating='N/A', review_count='N/A', brand='Lancôme', market=market
+            )]
+
+        with patch.object(scraper, '_search_products_async', side_effect=no_http_results), \
+                patch.object(scraper, 'search_lancome_products', side_effect=fake_search) as mock_search, \
+                patch.object(scraper, '_scrape_all_async', side_effect=fake_scrape_all), \
+                patch.object(scraper, 'close') as mock_close:
+            reviews = list(scraper.iter_reviews())
+
+        self.assertCountEqual(reviews, reviews_by_market['vietnam'] + reviews_by_market['saudi_arabia'])
+        self.assertEqual(mock_search.call_count, 2)
+        mock_close.assert_called_once()
+
+    def test_closing_iter_reviews_cancels_scrape(self):
+        """Test that a consumer leaving early cancels the scrape instead of waiting it out"""
+        import asyncio
+
+        scraper = TikTokShopScraper(headless=True, persist_session=False, cache_max_age=None)
+        cancelled = []
+
+        async def slow_scrape(markets, emit):
+            try:
+                for i in range(6):
+                    emit([Mock(name=f'review_{i}')])
+                    await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        with patch.object(scraper, '_scrape_markets_async', side_effect=slow_scrape), \
+                patch.object(scraper, 'close') as mock_close:
+            started = time.monotonic()
+            for _ in scraper.iter_reviews():
+                break
+            elapsed = time.monotonic() - started
+
+        self.assertLess(elapsed, 1)
+        self.assertEqual(cancelled, [True])
+        mock_close.assert_called_once()
+
+    def test_review_batch_queue_bounds_reviews(self):
+        """Test that the batch queue holds back producers by review count and releases them on close"""
+        import threading
+        from tiktok_shop_scraper_impl import ReviewBatchQueue
+
+        batches = ReviewBatchQueue(3)
+        self.assertTrue(batches.put([1, 2]))
+        # An oversized batch waits for room rather than being refused outright
+        results = []
+        producer = threading.Thread(target=lambda: results.append(batches.put([3, 4, 5, 6])))
+        producer.start()
+        producer.join(0.2)
+        self.assertTrue(producer.is_alive())
+
+        self.assertEqual(batches.get(), [1, 2])
+        producer.join(1)
+        self.assertEqual(results, [True])
+
+        # A full queue stops blocking once the consumer closes it
+        producer = threading.Thread(target=lambda: results.append(batches.put([7])))
+        producer.start()
+        producer.join(0.2)
+        self.assertTrue(producer.is_alive())
+        batches.close()
+        producer.join(1)
+        self.assertEqual(results, [True, False])
+
+        batches.finish()
+        self.assertEqual(batches.get(), [3, 4, 5, 6])
+        self.assertIsNone(batches.get())
+
+    def test_scrape_to_shares_writers(self):
+        """Test that every review is handed to each writer thread once and writer errors propagate"""
+        reviews = [Mock(name='first'), Mock(name='second')]
+        csv_writer, jsonl_writer = Mock(), Mock()
+
+        with patch.object(self.scraper, 'iter_review_batches', return_value=iter([reviews[:1], reviews[1:]])):
+            count = self.scraper.scrape_to(csv_writer, jsonl_writer)
+
+        self.assertEqual(count, 2)
+        for writer in (csv_writer, jsonl_writer):
+            self.assertEqual([c.args[0] for c in writer.write.call_args_list], reviews)
+
+        # A failing writer surfaces once scraping has finished
+        jsonl_writer.write.side_effect = OSError('disk full')
+        with patch.object(self.scraper, 'iter_review_batches', return_value=iter([reviews])):
+            with self.assertRaises(OSError):
+                self.scraper.scrape_to(csv_writer, jsonl_writer)
+
+    @patch('tiktok_shop_scraper_impl.multiprocessing.util.Finalize')
+    @patch('tiktok_shop_scraper_impl.logging.basicConfig')
+    def test_scrape_product_worker(self, mock_basic_config, mock_finalize):
+        """Test that pool workers get private session files and return picklable reviews"""
+        import pickle
+        import tempfile
+        import tiktok_shop_scraper_impl as impl
+
+        review = ReviewInfo(
+            product_url=self.sample_product.url, product_name='Lancôme Test Product',
+            reviewer_name='Alice', rating='5', review_text='Great', review_date='2024-01-01',
+            verified_purchase='Yes', helpful_votes='1', review_id='r1',
+            country_market='vietnam', scrape_timestamp='2024-01-02T00:00:00'
+        )
+
+        # init_scrape_worker resets process-wide state meant for a fresh worker; restore it afterwards
+        driver_pool = dict(TikTokShopScraper._driver_pool)
+        leased_drivers = set(TikTokShopScraper._leased_drivers)
+        try:
+            with tempfile.TemporaryDirectory() as session_dir:
+                with open(os.path.join(session_dir, 'cookies.json'), 'w') as f:
+                    f.write('[]')
+
+                impl.init_scrape_worker({'session_dir': session_dir, 'persist_session': False})
+                worker = impl._worker_scraper
+                self.assertNotEqual(worker.session_dir, session_dir)
+                self.assertTrue(os.path.exists(worker.cookies_path))
+                self.assertEqual(worker.cache_dir, os.path.join(session_dir, 'cache'))
+
+                with patch.object(worker, 'scrape_product_reviews', return_value=[review]), \
+                        patch.object(worker, 'random_delay'):
+                    rows = impl.scrape_product_worker(self.sample_product)
+        finally:
+            impl._worker_scraper = None
+            TikTokShopScraper._driver_pool.clear()
+            TikTokShopScraper._driver_pool.update(driver_pool)
+            TikTokShopScraper._leased_drivers.clear()
+            TikTokShopScraper._leased_drivers.update(leased_drivers)
+
+        self.assertEqual(pickle.loads(pickle.dumps(rows)), [review])
 
 
 class TestIntegration(unittest.TestCase):
     """Integration tests (require actual browser)"""
     
-    def setUp(self):
-        """Setup test environment"""
-        self.scraper = TikTokShopScraper(headless=True)
+    @classmethod
+    def setUpClass(cls):
+        """Setup test environment shared by all tests in the class"""
+        cls.scraper = TikTokShopScraper(headless=True)
     
     def test_save_to_csv(self):
         """Test CSV saving functionality"""
         import tempfile
         import os
         import csv
+        from dataclasses import replace
         
         # Create sample reviews
         sample_reviews = [
@@ -303,6 +1053,19 @@ class TestIntegration(unittest.TestCase):
                 review_id='test123',
                 country_market='vn',
                 scrape_timestamp='2024-08-21T10:00:00'
+            ),
+            ReviewInfo(
+                product_url='https://shop.tiktok.com/vn/product/123',
+                product_name='Test Product',
+                reviewer_name='OtherUser',
+                rating='4',
+                review_text='Good, but "pricey", overall.',
+                review_date='2024-08-16',
+                verified_purchase='N/A',
+                helpful_votes='0',
+                review_id='test456',
+                country_market='vn',
+                scrape_timestamp='2024-08-21T10:00:00'
             )
         ]
         
@@ -311,8 +1074,8 @@ class TestIntegration(unittest.TestCase):
             tmp_filename = tmp_file.name
         
         try:
-            # Save to CSV
-            self.scraper.save_to_csv(sample_reviews, tmp_filename)
+            # Save to CSV from a generator, as the streaming scrape produces them
+            self.scraper.save_to_csv((review for review in sample_reviews), tmp_filename)
             
             # Verify file was created and contains data
             self.assertTrue(os.path.exists(tmp_filename))
@@ -322,47 +1085,174 @@ class TestIntegration(unittest.TestCase):
                 reader = csv.DictReader(f)
                 rows = list(reader)
                 
-            self.assertEqual(len(rows), 1)
+            self.assertEqual(len(rows), len(sample_reviews))
             self.assertEqual(rows[0]['product_name'], 'Test Product')
             self.assertEqual(rows[0]['reviewer_name'], 'TestUser')
+            self.assertEqual(rows[1]['review_text'], 'Good, but "pricey", overall.')
+
+            # Rows end in a bare newline, without the excel dialect's \r
+            with open(tmp_filename, 'rb') as f:
+                self.assertNotIn(b'\r', f.read())
+
+            # Carriage returns in any field are written as \n, even a lone \r
+            stray = replace(sample_reviews[0], reviewer_name='Test\rUser', review_text='One\r\nTwo\rThree')
+            self.scraper.save_to_csv([stray], tmp_filename)
+            with open(tmp_filename, 'rb') as f:
+                self.assertNotIn(b'\r', f.read())
+            with open(tmp_filename, 'r', encoding='utf-8', newline='') as f:
+                row = next(csv.DictReader(f))
+            self.assertEqual(row['reviewer_name'], 'Test\nUser')
+            self.assertEqual(row['review_text'], 'One\nTwo\nThree')
+
+            # A field that is not a str is written as csv formats it, alongside rewritten text
+            odd = replace(stray, helpful_votes=7)
+            self.scraper.save_to_csv([odd, sample_reviews[1]], tmp_filename)
+            with open(tmp_filename, 'r', encoding='utf-8', newline='') as f:
+                rows = list(csv.DictReader(f))
+            self.assertEqual([row['helpful_votes'] for row in rows], ['7', '0'])
+            self.assertEqual(rows[0]['review_text'], 'One\nTwo\nThree')
             
         finally:
             # Cleanup
             if os.path.exists(tmp_filename):
                 os.unlink(tmp_filename)
 
+    def test_save_to_json(self):
+        """Test JSON array and JSON Lines saving keep field names and non-ASCII text"""
+        import tempfile
+        from dataclasses import asdict
+
+        review = ReviewInfo(
+            product_url='https://shop.tiktok.com/vn/product/123',
+            product_name='Lancôme Test Product',
+            reviewer_name='Người dùng',
+            rating='5',
+            review_text='Sản phẩm tuyệt vời!',
+            review_date='2024-08-15',
+            verified_purchase='Yes',
+            helpful_votes='3',
+            review_id='test789',
+            country_market='vn',
+            scrape_timestamp='2024-08-21T10:00:00'
+        )
+
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, 'reviews.json')
+            self.scraper.save_to_json([review], filename)
+            with open(filename, encoding='utf-8') as f:
+                content = f.read()
+
+        self.assertIn('Sản phẩm tuyệt vời!', content)
+        self.assertEqual(json.loads(content), [asdict(review)])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, 'reviews.jsonl')
+            self.scraper.save_to_jsonl(iter([review, review]), filename)
+            with open(filename, encoding='utf-8') as f:
+                lines = f.read().splitlines()
+
+        self.assertEqual([json.loads(line) for line in lines], [asdict(review)] * 2)
+
+    @patch('tiktok_shop_scraper_impl.WRITE_BATCH_SIZE', 2)
+    @patch('tiktok_shop_scraper_impl.FLUSH_EVERY_ROWS', 2)
+    def test_writers_flush_in_batches(self):
+        """Test that batched writers emit full batches early and the remainder on exit"""
+        import csv
+        import tempfile
+        from tiktok_shop_scraper import CsvReviewWriter, JsonLinesReviewWriter
+
+        reviews = [ReviewInfo(*([str(i)] * 11)) for i in range(3)]
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, 'reviews.csv')
+            jsonl_path = os.path.join(tmp, 'reviews.jsonl')
+            with CsvReviewWriter(csv_path) as csv_writer, JsonLinesReviewWriter(jsonl_path) as jsonl_writer:
+                for review in reviews:
+                    csv_writer.write(review)
+                    jsonl_writer.write(review)
+                # The first batch of two went out; the third row is still pending
+                self.assertEqual(len(csv_writer._pending), 1)
+                self.assertEqual(len(jsonl_writer._pending), 1)
+                # ...and was flushed past the 1 MiB file buffer onto disk
+                with open(jsonl_path, encoding='utf-8') as f:
+                    self.assertEqual(len(f.read().splitlines()), 2)
+
+            with open(csv_path, encoding='utf-8', newline='') as f:
+                rows = list(csv.DictReader(f))
+            with open(jsonl_path, encoding='utf-8') as f:
+                lines = f.read().splitlines()
+
+        self.assertEqual([row['review_id'] for row in rows], ['0', '1', '2'])
+        self.assertEqual([json.loads(line)['review_id'] for line in lines], ['0', '1', '2'])
+
+    def test_writers_compress_zst_outputs(self):
+        """Test that .zst filenames are written as zstd streams that decompress to the plain output"""
+        import tempfile
+        import zstandard
+        from tiktok_shop_scraper import CsvReviewWriter, JsonLinesReviewWriter
+
+        reviews = [ReviewInfo(*([f'{i},"x"'] * 11)) for i in range(3)]
+        with tempfile.TemporaryDirectory() as tmp:
+            outputs = {}
+            for suffix in ('', '.zst'):
+                csv_path = os.path.join(tmp, f'reviews.csv{suffix}')
+                jsonl_path = os.path.join(tmp, f'reviews.jsonl{suffix}')
+                with CsvReviewWriter(csv_path) as csv_writer, JsonLinesReviewWriter(jsonl_path) as jsonl_writer:
+                    for review in reviews:
+                        csv_writer.write(review)
+                        jsonl_writer.write(review)
+                for path in (csv_path, jsonl_path):
+                    with open(path, 'rb') as f:
+                        outputs[path] = f.read()
+
+            for plain in ('reviews.csv', 'reviews.jsonl'):
+                compressed = outputs[os.path.join(tmp, plain + '.zst')]
+                decompressed = zstandard.ZstdDecompressor().stream_reader(compressed).read()
+                self.assertEqual(decompressed, outputs[os.path.join(tmp, plain)])
+
 
 def run_manual_tests():
     """Run manual tests that require user interaction"""
     print("\n🧪 Running Manual Tests")
     print("=" * 40)
     
-    # Test 1: Browser setup
-    print("\n1. Testing browser setup...")
+    # Both checks share one browser session to avoid a second Chrome cold start
+    scraper = TikTokShopScraper(headless=True)
     try:
-        scraper = TikTokShopScraper(headless=True)
         driver = scraper.setup_driver('vietnam')
-        driver.get('https://www.google.com')
-        title = driver.title
-        driver.quit()
-        print(f"✅ Browser test passed: {title}")
     except Exception as e:
         print(f"❌ Browser test failed: {e}")
+        return
     
-    # Test 2: TikTok Shop accessibility
-    print("\n2. Testing TikTok Shop accessibility...")
     try:
-        scraper = TikTokShopScraper(headless=True)
-        driver = scraper.setup_driver('vietnam')
-        url = scraper.get_tiktok_shop_url('vietnam')
-        driver.get(url)
-        time.sleep(3)
-        title = driver.title
+        # Test 1: Browser setup
+        print("\n1. Testing browser setup...")
+        try:
+            driver.get('https://www.google.com')
+            title = driver.title
+            print(f"✅ Browser test passed: {title}")
+        except Exception as e:
+            print(f"❌ Browser test failed: {e}")
+        
+        # Reset state between checks instead of restarting the browser
+        driver.delete_all_cookies()
+        driver.get('about:blank')
+        
+        # Test 2: TikTok Shop accessibility
+        print("\n2. Testing TikTok Shop accessibility...")
+        try:
+            url = scraper.get_tiktok_shop_url('vietnam')
+            driver.get(url)
+            # Pages load eagerly, so poll until the document is usable instead of sleeping
+            WebDriverWait(driver, 10, poll_frequency=0.1).until(
+                lambda d: d.execute_script("return document.readyState") in ('interactive', 'complete')
+            )
+            title = driver.title
+            print(f"✅ TikTok Shop accessible: {title}")
+        except Exception as e:
+            print(f"❌ TikTok Shop access failed: {e}")
+            print("This may be normal if TikTok Shop is geo-restricted")
+    finally:
         driver.quit()
-        print(f"✅ TikTok Shop accessible: {title}")
-    except Exception as e:
-        print(f"❌ TikTok Shop access failed: {e}")
-        print("This may be normal if TikTok Shop is geo-restricted")
     
     print("\n✅ Manual tests completed")
 
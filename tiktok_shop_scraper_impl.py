@@ -0,0 +1,2153 @@
+#!/usr/bin/env python3
+"""
+TikTok Shop Reviews Scraper for Lancôme Products
+Technical Assessment - Data Scientist Position
+
+Author: Aymane Aallaoui
+Target Markets: Vietnam, Saudi Arabia
+Target Brand: Lancôme
+"""
+
+from __future__ import annotations
+
+import time
+import csv
+import asyncio
+import gzip
+import queue
+import hashlib
+import random
+import atexit
+import logging
+import re
+import os
+import shutil
+import sys
+import threading
+from collections import deque
+from operator import attrgetter
+import multiprocessing
+import multiprocessing.util
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Dict, Optional, Tuple, Union
+from urllib.parse import urljoin, quote
+from dataclasses import dataclass, fields
+
+import orjson
+import xxhash
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+
+# Selenium and BeautifulSoup are imported inside the methods that use them: importing
+# selenium.webdriver alone costs ~100 ms, which cached/HTTP-only runs never need.
+if TYPE_CHECKING:
+    from selenium import webdriver
+
+__all__ = [
+    'ProductInfo',
+    'ReviewInfo',
+    'FIELDNAMES',
+    'CsvReviewWriter',
+    'JsonArrayReviewWriter',
+    'JsonLinesReviewWriter',
+    'TikTokShopScraper',
+    'is_target_brand',
+    'stable_review_id',
+    'main',
+]
+
+
+_PRODUCT_ID_RE = re.compile(r'/product/(\d+)')
+
+
+# Spellings of the target brand seen in product titles (accented, unaccented, Arabic)
+BRAND_ALIASES = ('lancome', 'lancôme', 'lancòme', 'lanco\u0302me', 'لانكوم')
+_BRAND_RE = re.compile('|'.join(re.escape(alias) for alias in BRAND_ALIASES), re.IGNORECASE)
+
+
+def is_target_brand(name: str) -> bool:
+    """True if a product name mentions the target brand under any known spelling"""
+    return _BRAND_RE.search(name) is not None
+
+
+def write_atomic(path: str, data: bytes):
+    """Write a file via a temp file and os.replace so readers never see a partial write.
+    
+    The temp name includes the PID since pool workers share the page cache and can
+    write the same entry at the same time.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _interned(value, default: str) -> str:
+    """value as an interned str so repeats share one object, or default if it is empty/not a str"""
+    return sys.intern(value) if value and type(value) is str else default
+
+
+def stable_review_id(text: str) -> str:
+    """Review ID derived from review content, identical across runs and processes"""
+    return xxhash.xxh64_hexdigest(text.encode('utf-8'))
+
+
+def _slots_getstate(self) -> tuple:
+    return tuple(getattr(self, name) for name in self.__slots__)
+
+
+def _slots_setstate(self, state: tuple):
+    # Frozen dataclasses reject setattr, which the default slots unpickling relies on
+    for name, value in zip(self.__slots__, state):
+        object.__setattr__(self, name, value)
+
+
+@dataclass(frozen=True)
+class ProductInfo:
+    """Data class for product information"""
+    # Explicit __slots__ (dataclass(slots=True) needs Python 3.10) drop the per-instance __dict__
+    __slots__ = ('url', 'name', 'price', 'rating', 'review_count', 'brand', 'market')
+    __getstate__ = _slots_getstate
+    __setstate__ = _slots_setstate
+    
+    url: str
+    name: str
+    price: str
+    rating: str
+    review_count: str
+    brand: str
+    market: str
+
+
+@dataclass(frozen=True)
+class ReviewInfo:
+    """Data class for review information"""
+    __slots__ = (
+        'product_url', 'product_name', 'reviewer_name', 'rating', 'review_text', 'review_date',
+        'verified_purchase', 'helpful_votes', 'review_id', 'country_market', 'scrape_timestamp'
+    )
+    __getstate__ = _slots_getstate
+    __setstate__ = _slots_setstate
+    
+    product_url: str
+    product_name: str
+    reviewer_name: str
+    rating: str
+    review_text: str
+    review_date: str
+    verified_purchase: str
+    helpful_votes: str
+    review_id: str
+    country_market: str
+    scrape_timestamp: str
+
+
+# Output column order, and a getter that projects a review onto it without asdict/astuple copies
+FIELDNAMES = tuple(field.name for field in fields(ReviewInfo))
+review_row = attrgetter(*FIELDNAMES)
+
+
+def csv_row(review: ReviewInfo) -> tuple:
+    """Project a review onto FIELDNAMES with every CRLF and lone CR turned into LF.
+    
+    A stray CR inside a quoted field survives a csv round trip only for readers opened
+    with newline=''; normalising keeps the file consistently LF-only.
+    """
+    row = review_row(review)
+    # Fields are not guaranteed to be str; anything else is left for csv to format
+    if not any(type(value) is str and '\r' in value for value in row):
+        return row
+    return tuple(
+        value.replace('\r\n', '\n').replace('\r', '\n') if type(value) is str else value
+        for value in row
+    )
+
+
+def compile_review_builder(field_exprs: Dict[str, str], params: Iterable[str]):
+    """Compile a function that builds a ReviewInfo from one source expression per field.
+    
+    The generated body is one slot store per field. It skips the frozen dataclass
+    __init__, which routes every field through object.__setattr__.
+    """
+    if tuple(field_exprs) != FIELDNAMES:
+        raise ValueError(f"Review builder fields must be exactly {FIELDNAMES}")
+    namespace = {'_new': object.__new__, '_cls': ReviewInfo, '_intern': sys.intern, '_interned': _interned}
+    lines = [f"def build_review({', '.join(params)}):", "    review = _new(_cls)"]
+    for name, expr in field_exprs.items():
+        namespace[f'_set_{name}'] = getattr(ReviewInfo, name).__set__
+        lines.append(f"    _set_{name}(review, {expr})")
+    lines.append("    return review")
+    exec(compile('\n'.join(lines), '<build_review>', 'exec'), namespace)
+    return namespace['build_review']
+
+
+# How each field is read from a router data review node `n`; the other names are builder arguments
+ROUTER_REVIEW_FIELDS = {
+    'product_url': 'product_url',
+    'product_name': '_interned(n.get("product_name"), product_name)',
+    'reviewer_name': 'str(n.get("reviewer_name") or "Anonymous")',
+    'rating': '_intern(str(n.get("review_rating", "N/A")))',
+    'review_text': 'review_text',
+    'review_date': 'review_date',
+    'verified_purchase': '"Yes" if n.get("is_verified_purchase") else "N/A"',
+    'helpful_votes': '"0"',
+    'review_id': 'review_id',
+    'country_market': '_interned(n.get("review_country"), market)',
+    'scrape_timestamp': 'scrape_timestamp',
+}
+build_router_review = compile_review_builder(
+    ROUTER_REVIEW_FIELDS,
+    ('n', 'product_url', 'product_name', 'market', 'review_text', 'review_date', 'review_id', 'scrape_timestamp')
+)
+
+# CSV output: minimal quoting and bare \n line endings (csv_row normalises field text to \n too)
+csv.register_dialect('tts', delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL, lineterminator='\n')
+
+# Rows held by the streaming writers before they are handed to the file in one call, and
+# rows between explicit flushes so a crash mid-scrape loses at most this many
+WRITE_BATCH_SIZE = 1000
+FLUSH_EVERY_ROWS = 5000
+
+# zstd level for outputs named *.zst; 3 is zstd's default speed/ratio trade-off
+ZSTD_LEVEL = 3
+
+
+def open_output(filename: str, text: bool = False):
+    """Open an output file for writing, compressed on the fly with zstd if it ends in .zst"""
+    if filename.endswith('.zst'):
+        import zstandard
+        
+        # threads=-1 compresses on zstd's own worker threads, overlapping with the scrape
+        cctx = zstandard.ZstdCompressor(level=ZSTD_LEVEL, threads=-1)
+        if text:
+            return zstandard.open(filename, 'wt', cctx=cctx, encoding='utf-8', newline='')
+        return zstandard.open(filename, 'wb', cctx=cctx)
+    # A 1 MiB buffer keeps large exports from issuing a write per row
+    if text:
+        return open(filename, 'w', newline='', encoding='utf-8', buffering=1 << 20)
+    return open(filename, 'wb', buffering=1 << 20)
+
+
+class CsvReviewWriter:
+    """Context manager that appends reviews to a CSV file as they are scraped"""
+    
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.count = 0
+        self._file = None
+        self._writer = None
+        self._pending = []
+        self._flushed_count = 0
+        
+    def __enter__(self) -> CsvReviewWriter:
+        self._file = open_output(self.filename, text=True)
+        self._writer = csv.writer(self._file, dialect='tts')
+        self._writer.writerow(FIELDNAMES)
+        return self
+        
+    def write(self, review: ReviewInfo):
+        self._pending.append(csv_row(review))
+        self.count += 1
+        if len(self._pending) >= WRITE_BATCH_SIZE:
+            self.flush_pending()
+            
+    def flush_pending(self):
+        """Hand batched rows to the csv writer in one writerows call"""
+        self._writer.writerows(self._pending)
+        self._pending.clear()
+        if self.count - self._flushed_count >= FLUSH_EVERY_ROWS:
+            self._file.flush()
+            self._flushed_count = self.count
+        
+    def __exit__(self, *exc_info):
+        self.flush_pending()
+        self._file.close()
+
+
+class JsonArrayReviewWriter:
+    """Context manager that streams reviews into a JSON array, one object per line"""
+    
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.count = 0
+        self._file = None
+        
+    def __enter__(self) -> JsonArrayReviewWriter:
+        self._file = open_output(self.filename)
+        self._file.write(b'[')
+        return self
+        
+    def write(self, review: ReviewInfo):
+        self._file.write(b',\n' if self.count else b'\n')
+        self._file.write(orjson.dumps(review))
+        self.count += 1
+        if self.count % FLUSH_EVERY_ROWS == 0:
+            self._file.flush()
+        
+    def __exit__(self, *exc_info):
+        self._file.write(b'\n]\n' if self.count else b']\n')
+        self._file.close()
+
+
+class JsonLinesReviewWriter:
+    """Context manager that appends reviews to a JSON Lines file, one compact object per line"""
+    
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.count = 0
+        self._file = None
+        self._pending = []
+        self._flushed_count = 0
+        
+    def __enter__(self) -> JsonLinesReviewWriter:
+        self._file = open_output(self.filename)
+        return self
+        
+    def write(self, review: ReviewInfo):
+        self._pending.append(orjson.dumps(review, option=orjson.OPT_APPEND_NEWLINE))
+        self.count += 1
+        if len(self._pending) >= WRITE_BATCH_SIZE:
+            self.flush_pending()
+            
+    def flush_pending(self):
+        """Write batched lines with a single write call"""
+        self._file.write(b''.join(self._pending))
+        self._pending.clear()
+        if self.count - self._flushed_count >= FLUSH_EVERY_ROWS:
+            self._file.flush()
+            self._flushed_count = self.count
+        
+    def __exit__(self, *exc_info):
+        self.flush_pending()
+        self._file.close()
+
+
+class ReviewBatchQueue:
+    """Thread-safe FIFO of review batches, bounded by the number of reviews it holds.
+    
+    put() blocks while the queue is full, which is what holds a scrape back when its
+    consumer falls behind. A consumer that gives up calls close(), after which put()
+    returns False straight away instead of blocking.
+    """
+    
+    def __init__(self, max_reviews: int):
+        self.max_reviews = max_reviews
+        self.closed = False
+        self._batches = deque()
+        self._held = 0
+        self._cond = threading.Condition()
+        
+    def put(self, batch: List[ReviewInfo]) -> bool:
+        with self._cond:
+            # An oversized batch is still accepted once the queue has drained
+            while self._held and self._held + len(batch) > self.max_reviews and not self.closed:
+                self._cond.wait()
+            if self.closed:
+                return False
+            self._batches.append(batch)
+            self._held += len(batch)
+            self._cond.notify_all()
+            return True
+            
+    def finish(self):
+        """Mark the end of the stream; get() returns None once earlier batches are consumed"""
+        with self._cond:
+            self._batches.append(None)
+            self._cond.notify_all()
+            
+    def get(self) -> Optional[List[ReviewInfo]]:
+        with self._cond:
+            while not self._batches:
+                self._cond.wait()
+            batch = self._batches.popleft()
+            if batch is not None:
+                self._held -= len(batch)
+                self._cond.notify_all()
+            return batch
+            
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class TikTokShopScraper:
+    """Main scraper class for TikTok Shop reviews"""
+    
+    # Seconds close() waits for a running browser job before quitting its driver outright
+    BROWSER_RELEASE_TIMEOUT = 10
+    # Maximum number of idle drivers kept warm per _driver_pool_key
+    DRIVER_POOL_SIZE = 2
+    _driver_pool: Dict[tuple, queue.Queue] = {}
+    _leased_drivers: set = set()
+    # Persisted profile directories held by live drivers, and which driver holds each
+    _claimed_profiles: set = set()
+    _driver_profiles: Dict[object, str] = {}
+    _pool_lock = threading.Lock()
+    # Connections kept open between Selenium and chromedriver (urllib3 defaults to 1)
+    COMMAND_POOL_MAXSIZE = 20
+    
+    # Chrome subsystems a scraper never uses; disabling them cuts memory and start-up time
+    LEAN_CHROME_FLAGS = [
+        '--disable-gpu',
+        '--disable-extensions',
+        '--disable-background-networking',
+        '--disable-default-apps',
+        '--disable-sync',
+        '--disable-translate',
+        '--metrics-recording-only',
+        '--mute-audio',
+        '--no-first-run',
+        '--safebrowsing-disable-auto-update',
+        '--disable-ipc-flooding-protection'
+    ]
+    
+    # Script tag carrying the server-rendered page state, and the key holding product reviews
+    ROUTER_DATA_SCRIPT_ID = '__MODERN_ROUTER_DATA__'
+    REVIEW_INFO_KEY = 'review_info'
+    HTTP_TIMEOUT = 15
+    
+    # Keep-alive pool and retry policy for the HTTP fast path
+    HTTP_POOL_SIZE = 20
+    HTTP_RETRIES = 3
+    HTTP_BACKOFF_FACTOR = 0.3
+    HTTP_RETRY_STATUSES = [429, 500, 502, 503, 504]
+    
+    # Markets scraped by iter_reviews/run_complete_scraping, and products kept per search
+    TARGET_MARKETS = ['vietnam', 'saudi_arabia']
+    SEARCH_RESULT_LIMIT = 20
+    
+    # Reviews buffered between the scrape and each consumer before the scrape waits
+    REVIEW_QUEUE_SIZE = 5000
+    
+    # Requests in flight across all markets (override with TTS_CONCURRENCY), and connections per host
+    HTTP_CONCURRENCY = 16
+    HTTP_CONNECTIONS_PER_HOST = 8
+    
+    # Async fetches retry throttling/5xx responses with capped exponential backoff
+    HTTP_MAX_ATTEMPTS = 5
+    HTTP_MAX_BACKOFF = 60
+    
+    # Pause (seconds) before a request's semaphore slot is handed to the next request
+    HTTP_PACING = (0.5, 1.5)
+    
+    # Pause (seconds) between products scraped in the browser
+    PRODUCT_DELAY = (1, 2)
+    
+    # Disk cache size (bytes) for persisted Chrome profiles
+    DISK_CACHE_SIZE = 256 * 1024 * 1024
+    
+    # gzip level for the page cache; level 5 is several times faster than the default 9 on
+    # large product pages for a few percent more disk
+    CACHE_COMPRESS_LEVEL = 5
+    
+    # Resources that are never needed to read review text, blocked through CDP by default
+    BLOCKED_URL_PATTERNS = [
+        '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.woff*', '*.css', '*.mp4',
+        '*google-analytics*', '*googletagmanager*', '*doubleclick*'
+    ]
+    
+    # Containers that hold the review list on a product page, in priority order
+    REVIEW_SECTION_SELECTORS = [
+        '.reviews-section',
+        '.review-list',
+        '[data-testid*="review"]',
+        '[class*="review"]',
+        '[class*="comment"]',
+        '#reviews',
+        '.comment-section'
+    ]
+    
+    # Selectors for individual review elements
+    REVIEW_ELEMENT_SELECTORS = [
+        '.review-item',
+        '.comment-item',
+        '.feedback-item',
+        '[data-testid*="review"]',
+        '[data-e2e*="review"]',
+        '[data-e2e*="comment"]',
+        '[class*="Review"]',
+        '[class*="review"]',
+        '[class*="Comment"]',
+        '[class*="comment"]'
+    ]
+    
+    # Selectors counted in debug probe reports
+    PROBE_SELECTORS = [
+        '.reviews-section',
+        '.review-list',
+        '[data-testid*="review"]',
+        '[data-e2e*="review"]',
+        '[data-e2e*="comment"]',
+        '[class*="Review"]',
+        '[class*="review"]',
+        '[class*="Comment"]',
+        '[class*="comment"]',
+        '.review-item',
+        '.comment-item',
+        '.feedback-item',
+        '#reviews'
+    ]
+    
+    # Selector probes run in the page so each check is one WebDriver round-trip.
+    # Invalid selectors are skipped, matching the per-selector try/except they replace.
+    FIRST_MATCH_JS = """
+        for (const selector of arguments[0]) {
+            try {
+                const element = document.querySelector(selector);
+                if (element) return element;
+            } catch (e) {}
+        }
+        return null;
+    """
+    ALL_MATCHES_JS = """
+        const found = new Set();
+        for (const selector of arguments[0]) {
+            try {
+                document.querySelectorAll(selector).forEach(element => found.add(element));
+            } catch (e) {}
+        }
+        return Array.from(found);
+    """
+    MATCH_COUNTS_JS = """
+        return arguments[0].map(selector => {
+            try {
+                return document.querySelectorAll(selector).length;
+            } catch (e) {
+                return 0;
+            }
+        });
+    """
+    
+    # Candidate selectors per review field, tried in order
+    REVIEW_FIELD_SELECTORS = {
+        'reviewer_name': ['.reviewer-name', '.username', '.author'],
+        'rating': ['.rating', '.star-rating', '.score'],
+        'review_text': ['.review-text', '.comment-text', '.content'],
+        'review_date': ['.review-date', '.timestamp', '.date'],
+        'helpful_votes': ['.helpful-count', '.likes', '.thumbs-up'],
+    }
+    
+    # The same selectors joined per field, so each field is a single querySelector
+    REVIEW_FIELD_QUERIES = {field: ', '.join(selectors) for field, selectors in REVIEW_FIELD_SELECTORS.items()}
+    
+    # Reads every review field of an element in one round-trip (null when no selector matches)
+    REVIEW_FIELDS_JS = """
+        const [element, fieldQueries] = arguments;
+        const values = {};
+        for (const [field, query] of Object.entries(fieldQueries)) {
+            const match = element.querySelector(query);
+            const rating = match && field === 'rating' ? match.getAttribute('data-rating') : null;
+            values[field] = match ? rating || match.innerText.trim() : null;
+        }
+        return values;
+    """
+    
+    # Product card fields, as joined selector lists
+    PRODUCT_NAME_SELECTOR = '.product-name, .item-title, h3, h4'
+    PRODUCT_PRICE_SELECTOR = '.price, .product-price, .cost'
+    PRODUCT_RATING_SELECTOR = '.rating, .star-rating'
+    PRODUCT_REVIEW_COUNT_SELECTOR = '.review-count, .reviews'
+    
+    def __init__(
+        self,
+        headless: Union[bool, str] = True,
+        proxy: Optional[str] = None,
+        enable_debug_dumps: bool = False,
+        persist_session: bool = True,
+        session_dir: str = "session",
+        use_http: bool = True,
+        cache_max_age: Optional[float] = 6 * 3600,
+        max_workers: int = 1,
+        block_patterns: Optional[List[str]] = None,
+        parse_workers: Optional[int] = None
+    ):
+        self.setup_logging()
+        self.markets = {
+            'vietnam': 'vn',
+            'saudi_arabia': 'sa',
+            'philippines': 'ph'
+        }
+        # Shop base URLs are fixed per market, so build them once
+        self._market_urls = {
+            market: f"https://shop.tiktok.com/{code}" for market, code in self.markets.items()
+        }
+        self.user_agents = [
+            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+        ]
+        self.headless = headless
+        self.proxy = proxy
+        self.enable_debug_dumps = enable_debug_dumps
+        self.persist_session = persist_session
+        self.session_dir = session_dir
+        self.cookies_path = os.path.join(self.session_dir, "cookies.json")
+        # Product pages fetched within cache_max_age seconds are reused; None/0 disables
+        self.cache_dir = os.path.join(self.session_dir, "cache")
+        self.cache_max_age = cache_max_age
+        self.use_http = use_http
+        # URL patterns the browser never requests (pass [] to load everything)
+        self.block_patterns = list(self.BLOCKED_URL_PATTERNS if block_patterns is None else block_patterns)
+        # Number of worker processes (each with its own browser) used to scrape products
+        self.max_workers = max_workers
+        # Processes parsing pages fetched by the async HTTP path (None: one per CPU, 0: parse inline)
+        self.parse_workers = os.cpu_count() if parse_workers is None else parse_workers
+        self._parse_pool = None
+        self._session_cookies_loaded = False
+        self.driver = None
+        self._driver_market = None
+        # Markets are scraped concurrently but share this scraper's browser; reentrant so
+        # close() can take it from inside a browser job
+        self._browser_lock = threading.RLock()
+        # Set when the consumer of iter_review_batches stops early, so browser work winds down
+        self._stop_scraping = threading.Event()
+        # Shared by every market's requests; created on first use in each event loop
+        self.http_concurrency = int(os.getenv('TTS_CONCURRENCY', str(self.HTTP_CONCURRENCY)))
+        self._sem = None
+        self._sem_loop = None
+        # Per-instance RNG so concurrent scrapers don't contend on the module-level state
+        self._rng = random.Random()
+        self.session = self.build_http_session()
+        
+    def build_http_session(self) -> requests.Session:
+        """HTTP session with pooled keep-alive connections and retries on throttling/5xx"""
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.HTTP_POOL_SIZE,
+            pool_maxsize=self.HTTP_POOL_SIZE,
+            max_retries=Retry(
+                total=self.HTTP_RETRIES,
+                backoff_factor=self.HTTP_BACKOFF_FACTOR,
+                status_forcelist=self.HTTP_RETRY_STATUSES
+            )
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        # One user agent per session so it stays consistent with the session's cookies
+        session.headers['User-Agent'] = self._rng.choice(self.user_agents)
+        return session
+        
+    def setup_logging(self):
+        """Setup logging configuration"""
+        logging.basicConfig(
+            level=logging.INFO,
+            format='%(asctime)s - %(levelname)s - %(message)s',
+            handlers=[
+                logging.FileHandler('scraper.log'),
+                logging.StreamHandler()
+            ]
+        )
+        self.logger = logging.getLogger(__name__)
+        
+    def setup_driver(self, market: str) -> webdriver.Chrome:
+        """Setup Chrome driver with appropriate options"""
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        
+        options = Options()
+        
+        # headless="old" keeps the legacy headless mode for Chrome builds where the new one misbehaves
+        if self.headless == 'old':
+            options.add_argument('--headless')
+        elif self.headless:
+            options.add_argument('--headless=new')
+            
+        # Return from driver.get() at DOMContentLoaded; callers wait for what they need
+        options.page_load_strategy = 'eager'
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        options.add_argument('--disable-blink-features=AutomationControlled')
+        for flag in self.LEAN_CHROME_FLAGS:
+            options.add_argument(flag)
+        options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        options.add_experimental_option('useAutomationExtension', False)
+        options.add_argument(f'--user-agent={self._rng.choice(self.user_agents)}')
+        # Review scraping only needs DOM text: skip images, stylesheets and notification prompts
+        options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.managed_default_content_settings.stylesheets": 2,
+            "profile.default_content_setting_values.notifications": 2
+        })
+        profile_path = None
+        if self.persist_session:
+            os.makedirs(self.session_dir, exist_ok=True)
+            profile_path = self._claim_profile(market)
+            options.add_argument(f'--user-data-dir={profile_path}')
+            options.add_argument('--profile-directory=Default')
+            # Keep a large HTTP/compiled-script cache in the persisted profile
+            options.add_argument(f'--disk-cache-size={self.DISK_CACHE_SIZE}')
+        
+        # Add proxy if provided
+        if self.proxy:
+            options.add_argument(f'--proxy-server={self.proxy}')
+            
+        # Market-specific configurations
+        if market == 'vn':
+            options.add_argument('--lang=vi-VN')
+        elif market == 'sa':
+            options.add_argument('--lang=ar-SA')
+        elif market in ('ph', 'philippines'):
+            options.add_argument('--lang=en-PH')
+            
+        driver = None
+        try:
+            driver = webdriver.Chrome(options=options, keep_alive=True)
+            if profile_path:
+                with self._pool_lock:
+                    self._driver_profiles[driver] = profile_path
+            self.enable_keep_alive(driver)
+            self.widen_command_pool(driver)
+            self.block_heavy_resources(driver)
+            driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            return driver
+        except Exception as e:
+            self.logger.error(f"Failed to setup driver: {e}")
+            if driver is not None:
+                self._quit_driver(driver)
+            elif profile_path:
+                with self._pool_lock:
+                    self._claimed_profiles.discard(profile_path)
+            raise
+            
+    def _claim_profile(self, market: str) -> str:
+        """Claim the first persisted profile directory for the market that no live driver uses.
+        
+        Chrome locks a user-data-dir to a single browser process, so pooled drivers for
+        the same market each need their own: chrome_profile_<market>, then _2, _3, ...
+        """
+        base = os.path.abspath(os.path.join(self.session_dir, f"chrome_profile_{market}"))
+        with self._pool_lock:
+            path, n = base, 1
+            while path in self._claimed_profiles:
+                n += 1
+                path = f"{base}_{n}"
+            self._claimed_profiles.add(path)
+        return path
+        
+    @classmethod
+    def _quit_driver(cls, driver):
+        """Quit a driver, ignoring errors, and free the profile directory it held"""
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        with cls._pool_lock:
+            profile_path = cls._driver_profiles.pop(driver, None)
+            cls._claimed_profiles.discard(profile_path)
+            
+    def block_heavy_resources(self, driver: webdriver.Chrome):
+        """Block image, font, stylesheet, video and tracker requests via Chrome DevTools"""
+        if not self.block_patterns:
+            return
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.block_patterns})
+        except Exception as e:
+            self.logger.debug(f"Could not block heavy resources: {e}")
+            
+    def enable_keep_alive(self, driver: webdriver.Chrome):
+        """Make sure driver commands reuse one HTTP connection.
+        
+        Without keep-alive every WebDriver command opens a new TCP connection to
+        chromedriver, which dominates the cost of the many small find_element calls
+        made per review.
+        """
+        executor = driver.command_executor
+        if getattr(executor, 'keep_alive', None) is True:
+            return
+        try:
+            executor.keep_alive = True
+            executor._conn = executor._get_connection_manager()
+        except Exception as e:
+            self.logger.debug(f"Could not enable keep-alive on driver connection: {e}")
+            
+    def widen_command_pool(self, driver: webdriver.Chrome):
+        """Raise the urllib3 pool size used for driver commands.
+        
+        Selenium builds its PoolManager with urllib3's default maxsize of 1, so
+        commands issued from several threads serialize and log "connection pool
+        is full" warnings. Updating the pool kwargs and clearing the existing
+        pools makes the next command open a pool with the larger size.
+        """
+        connection_manager = getattr(driver.command_executor, '_conn', None)
+        if connection_manager is None:
+            return
+        try:
+            connection_manager.connection_pool_kw.update(maxsize=self.COMMAND_POOL_MAXSIZE, block=False)
+            connection_manager.clear()
+        except Exception as e:
+            self.logger.debug(f"Could not resize driver command pool: {e}")
+            
+    def _driver_pool_key(self, market: str) -> tuple:
+        """Key identifying drivers that can be shared between scraper calls.
+        
+        The session settings are part of the key: a driver carries its profile and
+        cookies with it, so it must not be lent to a scraper with another session.
+        """
+        return (
+            market, self.headless, self.proxy, tuple(self.block_patterns),
+            self.persist_session, os.path.abspath(self.session_dir)
+        )
+        
+    def acquire_driver(self, market: str) -> webdriver.Chrome:
+        """Lend an idle pooled driver for the market, starting a new one on a miss"""
+        key = self._driver_pool_key(market)
+        with self._pool_lock:
+            idle = self._driver_pool.get(key)
+            
+        driver = None
+        if idle is not None:
+            try:
+                driver = idle.get_nowait()
+                self.logger.debug(f"Reusing pooled driver for {market}")
+            except queue.Empty:
+                pass
+                
+        if driver is None:
+            driver = self.setup_driver(market)
+            
+        with self._pool_lock:
+            self._leased_drivers.add(driver)
+        return driver
+        
+    def release_driver(self, driver: webdriver.Chrome, market: str):
+        """Reset a leased driver and return it to the pool, quitting it if the pool is full.
+        
+        Cookies are only cleared when the session is not persisted, since a persisted
+        profile is expected to keep its login/challenge state between products.
+        """
+        if driver is None:
+            return
+        with self._pool_lock:
+            self._leased_drivers.discard(driver)
+            idle = self._driver_pool.setdefault(
+                self._driver_pool_key(market), queue.Queue(maxsize=self.DRIVER_POOL_SIZE)
+            )
+            
+        try:
+            if not self.persist_session:
+                driver.delete_all_cookies()
+            driver.get('about:blank')
+            idle.put_nowait(driver)
+        except queue.Full:
+            self._quit_driver(driver)
+        except Exception as e:
+            self.logger.debug(f"Discarding driver that failed to reset: {e}")
+            self._quit_driver(driver)
+                
+    @contextmanager
+    def driver_for(self, market: str):
+        """Context manager lending a pooled driver for the duration of a block"""
+        driver = self.acquire_driver(market)
+        try:
+            yield driver
+        finally:
+            self.release_driver(driver, market)
+            
+    def _get_or_create_driver(self, market: str) -> webdriver.Chrome:
+        """Return the driver held for this market, swapping drivers when the market changes.
+        
+        The driver stays with the scraper across products until close() is called.
+        """
+        if self.driver is not None and self._driver_market == market:
+            if not self.persist_session:
+                try:
+                    self.driver.delete_all_cookies()
+                except Exception as e:
+                    self.logger.debug(f"Failed to clear cookies between products: {e}")
+            return self.driver
+            
+        self.close()
+        self.driver = self.acquire_driver(market)
+        self._driver_market = market
+        return self.driver
+        
+    def close(self):
+        """Hand the held driver back to the pool (pooled drivers quit at exit).
+        
+        A cancelled scrape can leave a browser job thread still driving the driver, so
+        this waits for _browser_lock first. If the job does not finish in time the driver
+        is quit instead of being pooled while another thread is using it.
+        """
+        if not self._browser_lock.acquire(timeout=self.BROWSER_RELEASE_TIMEOUT):
+            driver, self.driver, self._driver_market = self.driver, None, None
+            if driver is not None:
+                self.logger.warning("Browser job still running at close; quitting its driver")
+                with self._pool_lock:
+                    self._leased_drivers.discard(driver)
+                self._quit_driver(driver)
+            return
+        try:
+            if self.driver is not None:
+                self.release_driver(self.driver, self._driver_market)
+            self.driver = None
+            self._driver_market = None
+        finally:
+            self._browser_lock.release()
+            
+    @classmethod
+    def shutdown_pool(cls):
+        """Quit every pooled or leased driver (registered with atexit)"""
+        with cls._pool_lock:
+            drivers = list(cls._leased_drivers)
+            cls._leased_drivers.clear()
+            for idle in cls._driver_pool.values():
+                while True:
+                    try:
+                        drivers.append(idle.get_nowait())
+                    except queue.Empty:
+                        break
+            cls._driver_pool.clear()
+            
+        for driver in drivers:
+            cls._quit_driver(driver)
+            
+    def random_delay(self, min_seconds: float = 1.0, max_seconds: float = 3.0):
+        """Add random delay to avoid being detected as bot"""
+        time.sleep(self._rng.uniform(min_seconds, max_seconds))
+        
+    def get_tiktok_shop_url(self, market: str) -> str:
+        """Get TikTok Shop URL for specific market"""
+        try:
+            return self._market_urls[market]
+        except KeyError:
+            raise ValueError(f"Unsupported market: {market}") from None
+        
+    def search_lancome_products(self, market: str) -> List[ProductInfo]:
+        """Search for Lancôme products in specified market"""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.common.exceptions import TimeoutException
+        
+        self.logger.info(f"Searching for Lancôme products in {market}")
+        
+        self._get_or_create_driver(market)
+        products = []
+        
+        try:
+            base_url = self.get_tiktok_shop_url(market)
+            
+            # Method 1: Direct brand search
+            search_url = f"{base_url}/search?q={quote('lancome')}"
+            self.logger.info(f"Accessing search URL: {search_url}")
+            
+            self.driver.get(search_url)
+            self.random_delay(3, 5)
+            
+            # Wait for page to load
+            try:
+                WebDriverWait(self.driver, 10).until(
+                    EC.presence_of_element_located((By.CLASS_NAME, "product-card"))
+                )
+            except TimeoutException:
+                self.logger.warning("Product cards not found, trying alternative selectors")
+                
+            # Try multiple selectors for product cards
+            product_selectors = [
+                ".product-card",
+                "[data-testid*='product']",
+                ".item-card",
+                ".goods-card",
+                "a[href*='/product/']"
+            ]
+            
+            product_elements = []
+            for selector in product_selectors:
+                try:
+                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
+                    if elements:
+                        product_elements = elements
+                        self.logger.info(f"Found {len(elements)} products with selector: {selector}")
+                        break
+                except Exception as e:
+                    self.logger.debug(f"Selector {selector} failed: {e}")
+                    
+            if not product_elements:
+                self.logger.warning("No product elements found, trying page source parsing")
+                return self.parse_products_from_source(market)
+                
+            # Extract product information
+            for element in product_elements[:self.SEARCH_RESULT_LIMIT]:
+                try:
+                    product = self.extract_product_info(element, market)
+                    if product and is_target_brand(product.name):
+                        products.append(product)
+                        if self.logger.isEnabledFor(logging.INFO):
+                            self.logger.info(f"Found Lancôme product: {product.name}")
+                except Exception as e:
+                    self.logger.debug(f"Failed to extract product info: {e}")
+                    
+        except Exception as e:
+            self.logger.error(f"Error searching products in {market}: {e}")
+                
+        return products
+        
+    def parse_products_from_source(self, market: str) -> List[ProductInfo]:
+        """Parse products from page source as fallback method"""
+        from bs4 import BeautifulSoup
+        from selenium.webdriver.common.by import By
+        
+        products = []
+        try:
+            soup = BeautifulSoup(self.driver.page_source, 'lxml')
+            
+            # Look for links that might be product URLs
+            base_url = self.get_tiktok_shop_url(market)
+            product_urls = []
+            
+            for link in soup.select('a[href*="/product/"]'):
+                href = link['href']
+                if not href.startswith('http'):
+                    href = urljoin(base_url, href)
+                product_urls.append(href)
+                    
+            # Visit each product URL to get details
+            for url in product_urls[:10]:  # Limit to prevent timeout
+                try:
+                    self.driver.get(url)
+                    self.random_delay(2, 4)
+                    
+                    # Extract product name to check for Lancôme
+                    title_selectors = ['h1', '.product-title', '[data-testid*="title"]']
+                    product_name = ""
+                    
+                    for selector in title_selectors:
+                        try:
+                            title_element = self.driver.find_element(By.CSS_SELECTOR, selector)
+                            product_name = title_element.text.strip()
+                            break
+                        except:
+                            continue
+                            
+                    if product_name and is_target_brand(product_name):
+                        product = ProductInfo(
+                            url=url,
+                            name=product_name,
+                            price="N/A",
+                            rating="N/A",
+                            review_count="N/A",
+                            brand="Lancôme",
+                            market=market
+                        )
+                        products.append(product)
+                        
+                except Exception as e:
+                    self.logger.debug(f"Failed to extract product from {url}: {e}")
+                    
+        except Exception as e:
+            self.logger.error(f"Error parsing products from source: {e}")
+            
+        return products
+        
+    def extract_product_info(self, element, market: str) -> Optional[ProductInfo]:
+        """Extract product information from element"""
+        from selenium.webdriver.common.by import By
+        
+        try:
+            # Try to find product URL
+            url = ""
+            if element.tag_name == 'a':
+                url = element.get_attribute('href')
+            else:
+                link = element.find_element(By.TAG_NAME, 'a')
+                url = link.get_attribute('href')
+                
+            if not url.startswith('http'):
+                url = urljoin(self.get_tiktok_shop_url(market), url)
+                
+            # Each field is one query over a joined selector list; the first match wins
+            name_elements = element.find_elements(By.CSS_SELECTOR, self.PRODUCT_NAME_SELECTOR)
+            name = name_elements[0].text.strip() if name_elements else ""
+            
+            price_elements = element.find_elements(By.CSS_SELECTOR, self.PRODUCT_PRICE_SELECTOR)
+            price = price_elements[0].text.strip() if price_elements else "N/A"
+            
+            rating_elements = element.find_elements(By.CSS_SELECTOR, self.PRODUCT_RATING_SELECTOR)
+            rating = rating_elements[0].text.strip() if rating_elements else "N/A"
+            
+            review_elements = element.find_elements(By.CSS_SELECTOR, self.PRODUCT_REVIEW_COUNT_SELECTOR)
+            review_count = review_elements[0].text.strip() if review_elements else "N/A"
+                
+            return ProductInfo(
+                url=url,
+                name=name,
+                price=price,
+                rating=rating,
+                review_count=review_count,
+                brand="Lancôme",
+                market=market
+            )
+            
+        except Exception as e:
+            self.logger.debug(f"Failed to extract product info: {e}")
+            return None
+            
+    def scrape_product_reviews(self, product: ProductInfo, use_http: Optional[bool] = None) -> List[ReviewInfo]:
+        """Scrape reviews for a specific product (use_http=None follows the scraper setting)"""
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(f"Scraping reviews for: {product.name}")
+        
+        # Reuse a recent copy of the page, then try plain HTTP, before starting Chrome
+        cached_reviews = self._cached_reviews(product)
+        if cached_reviews:
+            return cached_reviews
+        
+        if self.use_http if use_http is None else use_http:
+            http_reviews = self._http_fetch_reviews(product)
+            if http_reviews:
+                if self.logger.isEnabledFor(logging.INFO):
+                    self.logger.info(f"Fetched {len(http_reviews)} reviews over HTTP")
+                return http_reviews
+            self.logger.info("HTTP fetch returned no reviews, falling back to the browser")
+        
+        return self.scrape_product_reviews_browser(product)
+        
+    def _cached_reviews(self, product: ProductInfo) -> List[ReviewInfo]:
+        """Reviews parsed from a fresh cached copy of the product page, if there is one"""
+        cached = self._cache_get(product.url, self.cache_max_age)
+        if not cached:
+            return []
+        reviews = self.parse_router_data_reviews(
+            cached.get("payload") or self.extract_router_data(cached.get("html", "")), product
+        )
+        if reviews and self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(f"Loaded {len(reviews)} reviews from cache")
+        return reviews
+        
+    def scrape_product_reviews_browser(self, product: ProductInfo) -> List[ReviewInfo]:
+        """Scrape reviews for a product by rendering its page in Chrome"""
+        reviews = []
+        seen_ids = set()
+        
+        def add_review(review: Optional[ReviewInfo]) -> bool:
+            # JSON and DOM pipelines can capture the same review; keep the first copy
+            if not review:
+                return False
+            if review.review_id not in seen_ids:
+                seen_ids.add(review.review_id)
+                reviews.append(review)
+            return True
+            
+        self._get_or_create_driver(product.market)
+        
+        try:
+            self.load_cookies_for_domain("https://www.tiktok.com")
+            self.driver.get(product.url)
+            self.wait_for_review_section()
+            dump_prefix = self.build_debug_prefix(product)
+            if self.enable_debug_dumps:
+                self.save_debug_page_source(f"{dump_prefix}_initial.html")
+                self.save_selector_probe_report(f"{dump_prefix}_initial_selector_probe.json")
+            
+            review_section = self.find_review_section()
+            if not review_section:
+                self.logger.warning(
+                    "No review section found. If a TikTok puzzle/check is shown, solve it in the open browser, then press Enter to retry."
+                )
+                input("After solving the puzzle and loading the product page, press Enter to continue...")
+                self.random_delay(1, 2)
+                if self.enable_debug_dumps:
+                    self.save_debug_page_source(f"{dump_prefix}_after_challenge.html")
+                    self.save_selector_probe_report(f"{dump_prefix}_after_challenge_selector_probe.json")
+                review_section = self.find_review_section()
+                
+            if not review_section:
+                self.logger.warning(f"No review section found for {product.url} after retry")
+                return []
+                
+            # Scroll to load more reviews
+            self.scroll_to_load_reviews()
+
+            # Prefer embedded JSON extraction when available (more stable than DOM selectors).
+            json_reviews = self.extract_reviews_from_embedded_json(product)
+            if json_reviews:
+                if self.logger.isEnabledFor(logging.INFO):
+                    self.logger.info(f"Extracted {len(json_reviews)} reviews from embedded JSON")
+                for review in json_reviews:
+                    add_review(review)
+            
+            # Extract individual reviews using broader selector coverage
+            review_elements = self.find_review_elements()
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info(f"Found {len(review_elements)} potential review elements")
+            
+            scrape_timestamp = datetime.now().isoformat()
+            element_texts = self.read_element_texts(review_elements)
+            for element, text in zip(review_elements, element_texts):
+                if add_review(self.extract_review_info(element, product, scrape_timestamp)):
+                    continue
+
+                # Fallback: use element text directly if structured selectors fail
+                add_review(self.extract_review_info_fallback(text, product, scrape_timestamp))
+
+            if not reviews:
+                if self.enable_debug_dumps:
+                    self.save_debug_page_source("debug_product_page.html")
+                    self.logger.warning(
+                        "No reviews extracted. Saved page source to debug_product_page.html for selector tuning."
+                    )
+                else:
+                    self.logger.warning("No reviews extracted.")
+
+            self.save_cookies()
+                    
+        except Exception as e:
+            self.logger.error(f"Error scraping reviews for {product.url}: {e}")
+                
+        return reviews
+
+    def _http_fetch_reviews(self, product: ProductInfo) -> List[ReviewInfo]:
+        """Fetch the product page over HTTP and parse reviews from its embedded JSON.
+        
+        Returns an empty list when the page carries no review data (e.g. an anti-bot
+        challenge page), so the caller can fall back to the browser.
+        """
+        self.load_cookies_into_session()
+        try:
+            response = self.session.get(product.url, timeout=self.HTTP_TIMEOUT)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            self.logger.debug(f"HTTP fetch failed for {product.url}: {e}")
+            return []
+            
+        return self._reviews_from_page(product, response.text)
+        
+    @classmethod
+    def page_parser(cls) -> TikTokShopScraper:
+        """Instance that can only parse pages: skips __init__'s log file, HTTP session and browser state"""
+        parser = cls.__new__(cls)
+        parser.logger = logging.getLogger(__name__)
+        return parser
+        
+    def parse_product_page(self, product: ProductInfo, html: str) -> Tuple[List[ReviewInfo], Optional[str]]:
+        """Reviews and router data text from a product page; pure parsing, safe in worker processes"""
+        script_content = self.extract_router_data(html)
+        return self.parse_router_data_reviews(script_content, product), script_content
+        
+    def _reviews_from_page(self, product: ProductInfo, html: str) -> List[ReviewInfo]:
+        """Parse reviews from a fetched product page, caching pages that carry reviews"""
+        reviews, script_content = self.parse_product_page(product, html)
+        if reviews:
+            self._cache_put(product.url, html, script_content)
+        return reviews
+        
+    def request_semaphore(self) -> asyncio.Semaphore:
+        """Semaphore capping in-flight requests for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._sem_loop is not loop:
+            self._sem = asyncio.Semaphore(self.http_concurrency)
+            self._sem_loop = loop
+        return self._sem
+        
+    def backoff_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Seconds to wait before retrying; honours Retry-After, else 2**attempt plus jitter"""
+        if retry_after:
+            try:
+                return min(self.HTTP_MAX_BACKOFF, max(0.0, float(retry_after)))
+            except ValueError:
+                try:
+                    retry_at = parsedate_to_datetime(retry_after)
+                    return min(self.HTTP_MAX_BACKOFF, max(0.0, retry_at.timestamp() - time.time()))
+                except (TypeError, ValueError):
+                    pass
+        return min(self.HTTP_MAX_BACKOFF, 2 ** attempt + self._rng.random())
+        
+    async def _fetch_page(self, url: str, session) -> Optional[str]:
+        """GET a page through the shared semaphore, retrying throttling/5xx with backoff.
+        
+        Each request keeps its semaphore slot for a jittered HTTP_PACING pause after it
+        completes. The pause runs on the event loop, so the caller goes on parsing meanwhile.
+        """
+        import aiohttp
+        
+        semaphore = self.request_semaphore()
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.HTTP_MAX_ATTEMPTS):
+            await semaphore.acquire()
+            try:
+                async with session.get(url) as response:
+                    if response.status not in self.HTTP_RETRY_STATUSES:
+                        response.raise_for_status()
+                        return await response.text()
+                    status = response.status
+                    delay = self.backoff_delay(attempt, response.headers.get('Retry-After'))
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.logger.debug(f"HTTP fetch failed for {url}: {e}")
+                return None
+            finally:
+                loop.call_later(self._rng.uniform(*self.HTTP_PACING), semaphore.release)
+                
+            if attempt + 1 < self.HTTP_MAX_ATTEMPTS:
+                # Sleep outside the semaphore so other requests keep going
+                self.logger.debug(f"HTTP {status} for {url}, retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                
+        self.logger.warning(f"Giving up on {url} after {self.HTTP_MAX_ATTEMPTS} attempts (HTTP {status})")
+        return None
+        
+    async def _fetch_reviews(self, product: ProductInfo, session) -> List[ReviewInfo]:
+        """Async counterpart of _http_fetch_reviews using a shared aiohttp session.
+        
+        Any failure (bad charset, unparsable page, broken parse pool) is logged and
+        yields no reviews, so only this product falls back to the browser.
+        """
+        try:
+            # Cache reads and writes are blocking file I/O plus gzip, so they run in the
+            # default executor rather than on the event loop
+            loop = asyncio.get_running_loop()
+            if self.cache_max_age:
+                cached_reviews = await loop.run_in_executor(None, self._cached_reviews, product)
+                if cached_reviews:
+                    return cached_reviews
+                    
+            html = await self._fetch_page(product.url, session)
+            if html is None:
+                return []
+            if self._parse_pool is None:
+                reviews, script_content = self.parse_product_page(product, html)
+            else:
+                # Parsing is CPU-bound, so hand it to another process and keep fetching meanwhile
+                reviews, script_content = await loop.run_in_executor(
+                    self._parse_pool, parse_page_worker, product, html
+                )
+            if reviews:
+                await loop.run_in_executor(None, self._cache_put, product.url, html, script_content)
+            return reviews
+        except Exception as e:
+            self.logger.warning(f"HTTP scrape failed for {product.url}: {e!r}")
+            return []
+        
+    async def _search_products_async(self, market: str, session) -> List[ProductInfo]:
+        """Find Lancôme products from the search page's server-rendered data, without a browser"""
+        search_url = f"{self.get_tiktok_shop_url(market)}/search?q={quote('lancome')}"
+        self.logger.info(f"Fetching search URL over HTTP: {search_url}")
+        
+        html = await self._fetch_page(search_url, session)
+        if html is None:
+            return []
+        return self.parse_search_results(html, market)
+        
+    def parse_search_results(self, html: str, market: str) -> List[ProductInfo]:
+        """Build Lancôme ProductInfo rows from a search page's router data, or its product links"""
+        base_url = self.get_tiktok_shop_url(market)
+        found = {}
+        
+        try:
+            script_content = self.extract_router_data(html)
+            stack = [orjson.loads(script_content)] if script_content else []
+        except Exception as e:
+            self.logger.debug(f"Search router data could not be parsed: {e}")
+            stack = []
+            
+        # Product cards in the router data carry an id and a title
+        while stack and len(found) < self.SEARCH_RESULT_LIMIT:
+            node = stack.pop()
+            if isinstance(node, dict):
+                product_id = node.get("product_id")
+                name = node.get("title") or node.get("product_name")
+                if product_id and isinstance(name, str):
+                    found.setdefault(str(product_id), name.strip())
+                else:
+                    stack.extend(node.values())
+            elif isinstance(node, list):
+                # Reversed so cards keep their page order
+                stack.extend(reversed(node))
+                
+        if not found:
+            from bs4 import BeautifulSoup
+            
+            for link in BeautifulSoup(html, 'lxml').select('a[href*="/product/"]'):
+                product_id_match = _PRODUCT_ID_RE.search(link['href'])
+                if product_id_match:
+                    found.setdefault(product_id_match.group(1), link.get_text(" ", strip=True))
+                if len(found) >= self.SEARCH_RESULT_LIMIT:
+                    break
+                    
+        products = [
+            ProductInfo(
+                url=f"{base_url}/product/{product_id}",
+                name=name,
+                price="N/A",
+                rating="N/A",
+                review_count="N/A",
+                brand="Lancôme",
+                market=market
+            )
+            for product_id, name in found.items()
+            if is_target_brand(name)
+        ]
+        self.logger.info(f"Found {len(products)} Lancôme products over HTTP in {market}")
+        return products
+        
+    def client_session(self):
+        """aiohttp session carrying the HTTP session's user agent and persisted cookies"""
+        import aiohttp
+        
+        self.load_cookies_into_session()
+        return aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit_per_host=self.HTTP_CONNECTIONS_PER_HOST),
+            timeout=aiohttp.ClientTimeout(total=self.HTTP_TIMEOUT),
+            headers={'User-Agent': self.session.headers['User-Agent']},
+            cookies=self.session.cookies.get_dict()
+        )
+        
+    async def _scrape_all_async(self, products: List[ProductInfo], session=None) -> List[List[ReviewInfo]]:
+        """Fetch every product page concurrently, throttled by request_semaphore()"""
+        if session is None:
+            async with self.client_session() as session:
+                return await self._scrape_all_async(products, session)
+        return await asyncio.gather(*(self._fetch_reviews(product, session) for product in products))
+        
+    def _cache_path(self, url: str) -> str:
+        """Cache file holding the page fetched for a URL"""
+        return os.path.join(self.cache_dir, f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.json.gz")
+        
+    def _cache_get(self, url: str, max_age_s: Optional[float]) -> Optional[Dict]:
+        """Return the cached page entry for a URL if it is younger than max_age_s seconds"""
+        if not max_age_s:
+            return None
+        path = self._cache_path(url)
+        try:
+            if time.time() - os.path.getmtime(path) > max_age_s:
+                return None
+            with gzip.open(path, "rb") as f:
+                return orjson.loads(f.read())
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.debug(f"Ignoring unreadable cache entry for {url}: {e}")
+            return None
+            
+    def _cache_put(self, url: str, html: str, payload: Optional[str]):
+        """Store a fetched page (HTML and router data JSON) for later runs"""
+        if not self.cache_max_age:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            entry = {"url": url, "saved_at": datetime.now().isoformat(), "html": html, "payload": payload}
+            data = gzip.compress(orjson.dumps(entry), compresslevel=self.CACHE_COMPRESS_LEVEL)
+            write_atomic(self._cache_path(url), data)
+        except Exception as e:
+            self.logger.debug(f"Failed to cache page for {url}: {e}")
+        
+    def extract_router_data(self, html: str) -> Optional[str]:
+        """Return the text of the router data script from a page's HTML"""
+        from bs4 import BeautifulSoup
+        
+        soup = BeautifulSoup(html, 'lxml')
+        script = soup.find('script', id=self.ROUTER_DATA_SCRIPT_ID)
+        # orjson only accepts exact str, not bs4's NavigableString subclass
+        return str(script.string) if script and script.string else None
+        
+    def load_cookies_into_session(self):
+        """Copy persisted browser cookies into the HTTP session (once per scraper)."""
+        if self._session_cookies_loaded or not self.persist_session or not os.path.exists(self.cookies_path):
+            return
+        try:
+            with open(self.cookies_path, "rb") as f:
+                cookies = orjson.loads(f.read())
+            for cookie in cookies:
+                self.session.cookies.set(
+                    cookie["name"],
+                    cookie["value"],
+                    domain=cookie.get("domain", ""),
+                    path=cookie.get("path", "/")
+                )
+            self._session_cookies_loaded = True
+        except Exception as e:
+            self.logger.debug(f"Failed to load cookies into HTTP session: {e}")
+
+    def wait_for_review_section(self, timeout: float = 10) -> bool:
+        """Wait until any review container is in the DOM.
+
+        Pages load with the eager strategy, so navigation returns at DOMContentLoaded
+        and this explicit wait replaces a fixed sleep.
+        """
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.common.exceptions import TimeoutException
+
+        try:
+            WebDriverWait(self.driver, timeout).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, ', '.join(self.REVIEW_SECTION_SELECTORS)))
+            )
+            return True
+        except TimeoutException:
+            return False
+
+    def find_review_section(self):
+        """Find a review section using multiple selectors."""
+        try:
+            return self.driver.execute_script(self.FIRST_MATCH_JS, self.REVIEW_SECTION_SELECTORS)
+        except:
+            return None
+
+    def find_review_elements(self):
+        """Find candidate review elements using multiple selector strategies."""
+        try:
+            return self.driver.execute_script(self.ALL_MATCHES_JS, self.REVIEW_ELEMENT_SELECTORS) or []
+        except:
+            return []
+        
+    def scroll_to_load_reviews(self):
+        """Scroll page to trigger loading of more reviews"""
+        from selenium.webdriver.common.by import By
+        
+        try:
+            # Scroll down multiple times to load more content
+            for i in range(5):
+                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                self.random_delay(2, 3)
+                
+            # Try to click "Load More" buttons if they exist
+            load_more_selectors = [
+                '.load-more',
+                '.show-more',
+                'button[data-testid*="load"]'
+            ]
+            
+            for selector in load_more_selectors:
+                try:
+                    button = self.driver.find_element(By.CSS_SELECTOR, selector)
+                    if button.is_displayed() and button.is_enabled():
+                        button.click()
+                        self.random_delay(2, 3)
+                except:
+                    continue
+                    
+        except Exception as e:
+            self.logger.debug(f"Error during scroll/load more: {e}")
+
+    def save_cookies(self):
+        """Save browser cookies for reuse in next runs."""
+        if not self.persist_session or not self.driver:
+            return
+        try:
+            os.makedirs(self.session_dir, exist_ok=True)
+            cookies = self.driver.get_cookies()
+            write_atomic(self.cookies_path, orjson.dumps(cookies, option=orjson.OPT_INDENT_2))
+        except Exception as e:
+            self.logger.debug(f"Failed to save cookies: {e}")
+
+    def load_cookies_for_domain(self, base_url: str):
+        """Load stored cookies into the current browser session."""
+        if not self.persist_session or not self.driver or not os.path.exists(self.cookies_path):
+            return
+        try:
+            self.driver.get(base_url)
+            with open(self.cookies_path, "rb") as f:
+                cookies = orjson.loads(f.read())
+            for cookie in cookies:
+                try:
+                    clean_cookie = dict(cookie)
+                    clean_cookie.pop("sameSite", None)
+                    self.driver.add_cookie(clean_cookie)
+                except Exception:
+                    continue
+            self.driver.refresh()
+            self.logger.info("Loaded persisted cookies into browser session")
+        except Exception as e:
+            self.logger.debug(f"Failed to load cookies: {e}")
+            
+    def read_review_fields(self, element) -> Dict[str, Optional[str]]:
+        """Return the text of each review field under an element, keyed like REVIEW_FIELD_SELECTORS"""
+        return self.driver.execute_script(self.REVIEW_FIELDS_JS, element, self.REVIEW_FIELD_QUERIES)
+        
+    def extract_review_info(self, element, product: ProductInfo,
+                            scrape_timestamp: Optional[str] = None) -> Optional[ReviewInfo]:
+        """Extract review information from element"""
+        try:
+            values = self.read_review_fields(element)
+            reviewer_name = values.get('reviewer_name') or "Anonymous"
+            rating = values.get('rating') or "N/A"
+            review_text = (values.get('review_text') or "").replace('\r\n', '\n')
+            review_date = values.get('review_date') or "N/A"
+            helpful_votes = values.get('helpful_votes') or "0"
+                    
+            # Generate review ID
+            review_id = stable_review_id(reviewer_name + review_text + review_date)
+            
+            return ReviewInfo(
+                product_url=product.url,
+                product_name=product.name,
+                reviewer_name=reviewer_name,
+                rating=rating,
+                review_text=review_text,
+                review_date=review_date,
+                verified_purchase="N/A",
+                helpful_votes=helpful_votes,
+                review_id=review_id,
+                country_market=product.market,
+                scrape_timestamp=scrape_timestamp or datetime.now().isoformat()
+            )
+            
+        except Exception as e:
+            self.logger.debug(f"Failed to extract review info: {e}")
+            return None
+
+    def read_element_texts(self, elements) -> List[str]:
+        """Rendered text of each element, fetched in one round-trip"""
+        if not elements:
+            return []
+        try:
+            return self.driver.execute_script("return Array.from(arguments[0], e => e.innerText || '');", elements)
+        except Exception as e:
+            self.logger.debug(f"Failed to read review element text: {e}")
+            return [''] * len(elements)
+
+    def extract_review_info_fallback(self, text: str, product: ProductInfo,
+                                     scrape_timestamp: Optional[str] = None) -> Optional[ReviewInfo]:
+        """Fallback extraction from an element's rendered text when structured selectors fail."""
+        try:
+            text = text.strip()
+            if len(text) < 15:
+                return None
+
+            lines = [line.strip() for line in text.splitlines() if line.strip()]
+            review_text = max(lines, key=len) if lines else text
+            if len(review_text) < 10:
+                return None
+
+            reviewer_name = lines[0] if lines else "Anonymous"
+            review_id = stable_review_id(reviewer_name + review_text)
+
+            return ReviewInfo(
+                product_url=product.url,
+                product_name=product.name,
+                reviewer_name=reviewer_name,
+                rating="N/A",
+                review_text=review_text,
+                review_date="N/A",
+                verified_purchase="N/A",
+                helpful_votes="0",
+                review_id=review_id,
+                country_market=product.market,
+                scrape_timestamp=scrape_timestamp or datetime.now().isoformat()
+            )
+        except Exception as e:
+            self.logger.debug(f"Fallback review extraction failed: {e}")
+            return None
+
+    def save_debug_page_source(self, filename: str):
+        """Save current page source for debugging selectors."""
+        try:
+            with open(filename, 'w', encoding='utf-8') as f:
+                f.write(self.driver.page_source)
+        except Exception as e:
+            self.logger.debug(f"Failed to save debug page source: {e}")
+
+    def save_selector_probe_report(self, filename: str):
+        """Save candidate selector hit counts to help tune scraping logic."""
+        try:
+            counts = self.driver.execute_script(self.MATCH_COUNTS_JS, self.PROBE_SELECTORS)
+            report = dict(zip(self.PROBE_SELECTORS, counts))
+
+            write_atomic(filename, orjson.dumps(report, option=orjson.OPT_INDENT_2))
+            self.logger.info(f"Saved selector probe report to {filename}")
+        except Exception as e:
+            self.logger.debug(f"Failed to save selector probe report: {e}")
+
+    def build_debug_prefix(self, product: ProductInfo) -> str:
+        """Create a safe filename prefix for debug artifacts."""
+        product_id_match = _PRODUCT_ID_RE.search(product.url)
+        product_id = product_id_match.group(1) if product_id_match else "unknown"
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return f"debug_{product.market}_{product_id}_{timestamp}"
+
+    def extract_reviews_from_embedded_json(self, product: ProductInfo) -> List[ReviewInfo]:
+        """Extract review rows from the __MODERN_ROUTER_DATA__ JSON script."""
+        try:
+            script_content = self.driver.execute_script(
+                "const el = document.getElementById(arguments[0]);"
+                "return el ? el.textContent : null;",
+                self.ROUTER_DATA_SCRIPT_ID
+            )
+        except Exception as e:
+            self.logger.debug(f"Embedded JSON review extraction failed: {e}")
+            return []
+        reviews = self.parse_router_data_reviews(script_content, product)
+        if reviews:
+            self._cache_put(product.url, self.driver.page_source, script_content)
+        return reviews
+
+    def parse_router_data_reviews(self, script_content: Optional[str], product: ProductInfo) -> List[ReviewInfo]:
+        """Build ReviewInfo rows from router data JSON text (browser or HTTP sourced)."""
+        try:
+            if not script_content:
+                return []
+
+            payload = orjson.loads(script_content)
+            review_info = self.find_review_info_node(payload)
+            if not review_info:
+                return []
+
+            product_reviews = review_info.get("product_reviews", [])
+            extracted = []
+            scrape_timestamp = datetime.now().isoformat()
+            # Every row repeats these; one shared object each keeps pickled worker results small
+            product_url = sys.intern(product.url)
+            product_name = sys.intern(product.name)
+            market = sys.intern(product.market)
+            for item in product_reviews:
+                review_text = (item.get("review_text") or "").strip().replace('\r\n', '\n')
+                if not review_text:
+                    continue
+
+                review_time = item.get("review_time")
+                review_date = "N/A"
+                if review_time:
+                    try:
+                        review_date = datetime.fromtimestamp(int(review_time) / 1000).isoformat()
+                    except Exception:
+                        review_date = str(review_time)
+
+                review_id = str(item.get("review_id") or stable_review_id(review_text))
+
+                extracted.append(build_router_review(
+                    item, product_url, product_name, market, review_text, review_date, review_id, scrape_timestamp
+                ))
+            return extracted
+        except Exception as e:
+            self.logger.debug(f"Embedded JSON review extraction failed: {e}")
+            return []
+
+    def find_review_info_node(self, root):
+        """Depth-first search (explicit stack, no recursion) for a non-empty review_info dict.
+        
+        Children are pushed in reverse so they pop in document order, matching the
+        first-match-wins result of a recursive walk.
+        """
+        key = self.REVIEW_INFO_KEY
+        stack = [root]
+        pop, extend = stack.pop, stack.extend
+        while stack:
+            node = pop()
+            if isinstance(node, dict):
+                review_info = node.get(key)
+                if isinstance(review_info, dict) and review_info:
+                    return review_info
+                extend(reversed(list(node.values())))
+            elif isinstance(node, list):
+                extend(reversed(node))
+        return None
+            
+    def save_to_csv(self, reviews: Iterable[ReviewInfo], filename: str):
+        """Save reviews to CSV file, writing each row as the iterable produces it"""
+        try:
+            with CsvReviewWriter(filename) as writer:
+                for review in reviews:
+                    writer.write(review)
+            self.logger.info(f"Saved {writer.count} reviews to {filename}")
+            
+        except Exception as e:
+            self.logger.error(f"Error saving to CSV: {e}")
+
+    def save_to_jsonl(self, reviews: Iterable[ReviewInfo], filename: str):
+        """Save reviews to a JSON Lines file, writing each line as the iterable produces it"""
+        try:
+            with JsonLinesReviewWriter(filename) as writer:
+                for review in reviews:
+                    writer.write(review)
+            self.logger.info(f"Saved {writer.count} reviews to {filename}")
+        except Exception as e:
+            self.logger.error(f"Error saving to JSON Lines: {e}")
+
+    def save_to_json_array(self, reviews: Iterable[ReviewInfo], filename: str):
+        """Save reviews to a JSON array file, writing each object as the iterable produces it"""
+        try:
+            with JsonArrayReviewWriter(filename) as writer:
+                for review in reviews:
+                    writer.write(review)
+            self.logger.info(f"Saved {writer.count} reviews to {filename}")
+        except Exception as e:
+            self.logger.error(f"Error saving to JSON: {e}")
+            
+    def save_to_json(self, reviews: Iterable[ReviewInfo], filename: str):
+        """Save reviews to a JSON array file (kept for existing callers)"""
+        self.save_to_json_array(reviews, filename)
+            
+    def iter_reviews(self) -> Iterator[ReviewInfo]:
+        """Scrape all target markets concurrently, yielding reviews as each product finishes"""
+        for batch in self.iter_review_batches():
+            yield from batch
+            
+    def iter_review_batches(self) -> Iterator[List[ReviewInfo]]:
+        """Scrape all target markets concurrently, yielding each product's reviews as a batch.
+        
+        The markets run on an event loop in a background thread and hand batches over
+        through a ReviewBatchQueue, so a consumer that falls behind holds the scrape back
+        instead of letting reviews pile up in memory.
+        """
+        batches = ReviewBatchQueue(self.REVIEW_QUEUE_SIZE)
+        self._stop_scraping.clear()
+        # Created here so an early exit (break, Ctrl-C) can cancel the scrape from this thread
+        loop = asyncio.new_event_loop()
+        scrape_task = loop.create_task(self._scrape_markets_async(self.TARGET_MARKETS, batches.put))
+        
+        def run():
+            asyncio.set_event_loop(loop)
+            try:
+                loop.run_until_complete(scrape_task)
+            except asyncio.CancelledError:
+                self.logger.info("Scraping cancelled")
+            except Exception as e:
+                self.logger.error(f"Error scraping markets: {e}")
+            finally:
+                try:
+                    loop.run_until_complete(loop.shutdown_asyncgens())
+                finally:
+                    loop.close()
+                    batches.finish()
+                    
+        scrape_thread = threading.Thread(target=run, name="scrape-markets", daemon=True)
+        scrape_thread.start()
+        finished = False
+        try:
+            while True:
+                batch = batches.get()
+                if batch is None:
+                    finished = True
+                    break
+                yield batch
+        finally:
+            if not finished:
+                # Release blocked producers, stop browser work at the next product and
+                # cancel every in-flight coroutine
+                batches.close()
+                self._stop_scraping.set()
+                try:
+                    loop.call_soon_threadsafe(scrape_task.cancel)
+                except RuntimeError:
+                    pass  # The loop already finished and closed
+            scrape_thread.join()
+            self.close()
+            
+    def run_complete_scraping(self) -> List[ReviewInfo]:
+        """Run complete scraping process for both markets"""
+        return list(self.iter_reviews())
+        
+    def scrape_to(self, *writers) -> int:
+        """Scrape both markets straight into already-open review writers; returns the review count.
+        
+        Each writer runs in its own thread fed by a ReviewBatchQueue, so CSV and JSON
+        serialization overlap with each other and with the scrape.
+        """
+        errors = []
+        
+        def drain(writer, batches: ReviewBatchQueue):
+            write = writer.write
+            try:
+                while True:
+                    batch = batches.get()
+                    if batch is None:
+                        return
+                    for review in batch:
+                        write(review)
+            except Exception as e:
+                errors.append(e)
+                # Later batches for this writer are dropped instead of blocking the scrape
+                batches.close()
+                
+        writer_queues = [ReviewBatchQueue(self.REVIEW_QUEUE_SIZE) for _ in writers]
+        writer_threads = [
+            threading.Thread(target=drain, args=(writer, batches), name=f"review-writer-{i}", daemon=True)
+            for i, (writer, batches) in enumerate(zip(writers, writer_queues))
+        ]
+        for thread in writer_threads:
+            thread.start()
+            
+        count = 0
+        try:
+            for batch in self.iter_review_batches():
+                count += len(batch)
+                for batches in writer_queues:
+                    batches.put(batch)
+        finally:
+            for batches in writer_queues:
+                batches.finish()
+            for thread in writer_threads:
+                thread.join()
+                
+        if errors:
+            raise errors[0]
+        return count
+        
+    async def _scrape_markets_async(self, markets: List[str], emit):
+        """Scrape markets side by side; emit(reviews) is called with each finished batch.
+        
+        emit may block (it applies backpressure), so coroutines call it through the
+        default executor and browser jobs call it from their own thread.
+        """
+        if self.use_http and self.parse_workers:
+            # Spawned rather than forked: this runs beside the event loop and browser threads
+            self._parse_pool = ProcessPoolExecutor(
+                max_workers=self.parse_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_parse_worker
+            )
+        try:
+            await asyncio.gather(*(self._scrape_market(market, emit) for market in markets))
+        finally:
+            if self._parse_pool is not None:
+                self._parse_pool.shutdown()
+                self._parse_pool = None
+        
+    async def _scrape_market(self, market: str, emit):
+        """Find a market's products, fetch them over HTTP, and use the browser for the rest.
+        
+        Each market gets its own aiohttp session and cookie jar; request_semaphore() caps
+        requests across markets. The browser is shared, so Selenium work runs in a thread
+        under _browser_lock.
+        """
+        try:
+            self.logger.info(f"Starting scraping for {market}")
+            
+            async with self.client_session() as session:
+                # Step 1: Find Lancôme products, starting Chrome only if the search page gave nothing
+                products = []
+                if self.use_http:
+                    products = await self._search_products_async(market, session)
+                if not products:
+                    products = await self._run_browser_job(self.search_lancome_products, market)
+                self.logger.info(f"Found {len(products)} Lancôme products in {market}")
+                
+                # Step 2: Scrape reviews for each product
+                await self._scrape_market_products(products, emit, session)
+                
+        except Exception as e:
+            self.logger.error(f"Error scraping {market}: {e}")
+            
+    async def _scrape_market_products(self, products: List[ProductInfo], emit, session=None):
+        """Fetch review pages concurrently; only pages without review data need Chrome"""
+        loop = asyncio.get_running_loop()
+        browser_products = products
+        if self.use_http and products:
+            results = await self._scrape_all_async(products, session)
+            browser_products = []
+            for product, reviews in zip(products, results):
+                if reviews:
+                    if self.logger.isEnabledFor(logging.INFO):
+                        self.logger.info(f"Collected {len(reviews)} reviews for {product.name}")
+                    await loop.run_in_executor(None, emit, reviews)
+                else:
+                    browser_products.append(product)
+            if browser_products:
+                self.logger.info(f"{len(browser_products)} products had no reviews over HTTP, using the browser")
+                
+        if browser_products:
+            await self._run_browser_job(self._emit_browser_reviews, browser_products, emit)
+            
+    async def _run_browser_job(self, func, *args):
+        """Run func on a daemon thread while holding the browser, which one market drives at a time.
+        
+        A daemon thread rather than the default executor: a cancelled scrape must not keep
+        the process alive while Selenium (or an input() prompt) finishes.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        
+        def settle(result, error):
+            if not future.done():
+                if error is None:
+                    future.set_result(result)
+                else:
+                    future.set_exception(error)
+                    
+        def run():
+            result, error = None, None
+            try:
+                with self._browser_lock:
+                    result = func(*args)
+            except Exception as e:
+                error = e
+            try:
+                loop.call_soon_threadsafe(settle, result, error)
+            except RuntimeError:
+                pass  # The scrape was cancelled and its loop closed
+                
+        threading.Thread(target=run, name="browser-job", daemon=True).start()
+        return await future
+        
+    def _emit_browser_reviews(self, products: List[ProductInfo], emit):
+        for review in self.scrape_products_in_browser(products):
+            if self._stop_scraping.is_set():
+                break
+            emit([review])
+            
+    def scrape_products_in_browser(self, products: List[ProductInfo]) -> Iterator[ReviewInfo]:
+        """Scrape products with Chrome, in worker processes when max_workers > 1"""
+        if self.max_workers > 1 and len(products) > 1:
+            yield from self.scrape_products_parallel(products)
+            return
+            
+        for product in products:
+            if self._stop_scraping.is_set():
+                return
+            reviews = self.scrape_product_reviews(product, use_http=False)
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info(f"Collected {len(reviews)} reviews for {product.name}")
+            yield from reviews
+            
+            # Add delay between products
+            self.random_delay(*self.PRODUCT_DELAY)
+            
+    def worker_kwargs(self) -> Dict:
+        """Constructor arguments for scrapers running in worker processes"""
+        return {
+            'headless': self.headless,
+            'proxy': self.proxy,
+            'enable_debug_dumps': self.enable_debug_dumps,
+            'persist_session': self.persist_session,
+            'session_dir': self.session_dir,
+            'use_http': self.use_http,
+            'cache_max_age': self.cache_max_age,
+            'block_patterns': self.block_patterns
+        }
+        
+    def scrape_products_parallel(self, products: List[ProductInfo]) -> Iterator[ReviewInfo]:
+        """Scrape products in worker processes, one browser per worker.
+        
+        WebDriver is not thread-safe, so products are spread over processes. Workers
+        run without a console, so pages that need a manual challenge yield no reviews.
+        """
+        # Spawned like the parse pool: a fork here would copy browser threads' locks mid-use
+        with ProcessPoolExecutor(
+            max_workers=min(self.max_workers, len(products)),
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=init_scrape_worker,
+            # Workers only get products that need the browser, so they skip the HTTP attempt
+            initargs=({**self.worker_kwargs(), 'use_http': False},)
+        ) as executor:
+            results = executor.map(scrape_product_worker, products)
+            for product, reviews in zip(products, results):
+                if self.logger.isEnabledFor(logging.INFO):
+                    self.logger.info(f"Collected {len(reviews)} reviews for {product.name}")
+                yield from reviews
+
+
+atexit.register(TikTokShopScraper.shutdown_pool)
+
+
+# Scraper owned by the current worker process (set by init_scrape_worker or init_parse_worker)
+_worker_scraper: Optional[TikTokShopScraper] = None
+
+
+def init_scrape_worker(scraper_kwargs: Dict):
+    """Process-pool initializer: build this worker's scraper with private session files.
+    
+    Each worker gets its own session directory (Chrome profile, cookies.json) and log
+    file so parallel browsers don't contend for the profile lock or shared files. The
+    page cache stays shared since entries are written per URL.
+    """
+    global _worker_scraper
+    
+    parent_session_dir = scraper_kwargs.get('session_dir', 'session')
+    worker_dir = os.path.join(parent_session_dir, 'workers', str(os.getpid()))
+    os.makedirs(worker_dir, exist_ok=True)
+    
+    parent_cookies = os.path.join(parent_session_dir, 'cookies.json')
+    if os.path.exists(parent_cookies):
+        shutil.copyfile(parent_cookies, os.path.join(worker_dir, 'cookies.json'))
+        
+    # Drop handlers and pooled drivers inherited from a forked parent
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[logging.FileHandler(os.path.join(worker_dir, 'scraper.log'))],
+        force=True
+    )
+    TikTokShopScraper._driver_pool.clear()
+    TikTokShopScraper._leased_drivers.clear()
+    
+    _worker_scraper = TikTokShopScraper(**{**scraper_kwargs, 'session_dir': worker_dir, 'max_workers': 1})
+    _worker_scraper.cache_dir = os.path.join(parent_session_dir, 'cache')
+    
+    # Pool workers exit without running atexit hooks, so quit the browser explicitly
+    multiprocessing.util.Finalize(None, TikTokShopScraper.shutdown_pool, exitpriority=10)
+
+
+def scrape_product_worker(product: ProductInfo) -> List[ReviewInfo]:
+    """Process-pool task: scrape one product in this worker's browser"""
+    reviews = _worker_scraper.scrape_product_reviews(product)
+    _worker_scraper.random_delay(*_worker_scraper.PRODUCT_DELAY)
+    return reviews
+
+
+def init_parse_worker():
+    """Process-pool initializer for page parsing: a parse-only scraper logging to stderr.
+    
+    Workers never open scraper.log, which the parent process is already appending to.
+    """
+    global _worker_scraper
+    
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler()],
+        force=True
+    )
+    _worker_scraper = TikTokShopScraper.page_parser()
+
+
+def parse_page_worker(product: ProductInfo, html: str) -> Tuple[List[ReviewInfo], Optional[str]]:
+    """Process-pool task: parse one fetched product page"""
+    return _worker_scraper.parse_product_page(product, html)
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main execution function"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Scrape Lancôme product reviews from TikTok Shop")
+    parser.add_argument('--use-browser', action='store_true',
+                        help="drive Chrome for search and product pages instead of trying plain HTTP first")
+    parser.add_argument('--compress', action='store_true',
+                        help="write zstd-compressed .csv.zst/.jsonl.zst files")
+    args = parser.parse_args(argv)
+    
+    scraper = TikTokShopScraper(headless=False, use_http=not args.use_browser)  # Set headless=True for production
+    
+    csv_filename = "aymane_aallaoui_tiktok_shop_reviews_sample.csv"
+    jsonl_filename = "aymane_aallaoui_tiktok_shop_reviews_sample.jsonl"
+    if args.compress:
+        csv_filename += ".zst"
+        jsonl_filename += ".zst"
+    
+    try:
+        # One writer per output serves both markets; each review is appended as it arrives
+        with CsvReviewWriter(csv_filename) as csv_writer, JsonLinesReviewWriter(jsonl_filename) as jsonl_writer:
+            review_count = scraper.scrape_to(csv_writer, jsonl_writer)
+        
+        if review_count:
+            print(f"\nScraping completed! Found {review_count} reviews total.")
+            print(f"Results saved to {csv_filename} and {jsonl_filename}")
+        else:
+            print("No reviews found. This might be due to:")
+            print("- TikTok Shop not available in target markets")
+            print("- Lancôme products not available")
+            print("- Anti-bot protection blocking access")
+            print("- Changes in website structure")
+            
+    except Exception as e:
+        print(f"Error during execution: {e}")
+        
+    finally:
+        scraper.close()
+        
+
+if __name__ == "__main__":
+    main()
@@ -7,22 +7,27 @@ import re
 import time
 import random
 import hashlib
+import functools
 from datetime import datetime
 from typing import Optional, List, Dict
 from urllib.parse import urlparse, urljoin
 
 
+# Patterns compiled once at import time for the per-review hot paths
+_WHITESPACE_RE = re.compile(r'\s+')
+_NON_NUMERIC_RE = re.compile(r'[^\d.,]')
+
+
 def clean_text(text: str) -> str:
     """Clean and normalize text content"""
     if not text:
         return ""
     
-    # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text.strip())
+    # Remove extra whitespace (this also replaces newlines with spaces)
+    text = _WHITESPACE_RE.sub(' ', text.strip())
     
     # Remove special characters that might cause CSV issues
     text = text.replace('"', '""')  # Escape quotes for CSV
-    text = re.sub(r'[\r\n]+', ' ', text)  # Replace newlines with spaces
     
     return text
 
@@ -33,7 +38,7 @@ def extract_number_from_text(text: str) -> Optional[float]:
         return None
         
     # Remove common currency symbols and text
-    cleaned = re.sub(r'[^\d.,]', '', text)
+    cleaned = _NON_NUMERIC_RE.sub('', text)
     
     try:
         # Handle different decimal separators
@@ -49,6 +54,7 @@ def extract_number_from_text(text: str) -> Optional[float]:
         return None
 
 
+@functools.lru_cache(maxsize=4096)
 def normalize_rating(rating_text: str) -> str:
     """Normalize rating to standard format"""
     if not rating_text:
@@ -157,21 +163,21 @@ def validate_review_data(review_data: Dict) -> bool:
 
 
 def deduplicate_reviews(reviews: List[Dict]) -> List[Dict]:
-    """Remove duplicate reviews based on content similarity"""
+    """Remove duplicate reviews, keeping the first occurrence in original order"""
     seen_reviews = set()
     unique_reviews = []
     
     for review in reviews:
-        # Create a hash based on key fields
-        review_hash = generate_review_id(
+        # Key on the identifying fields directly; tuples hash in C, no digest needed
+        review_key = (
             review.get('reviewer_name', ''),
             review.get('review_text', ''),
             review.get('review_date', ''),
             review.get('product_url', '')
         )
         
-        if review_hash not in seen_reviews:
-            seen_reviews.add(review_hash)
+        if review_key not in seen_reviews:
+            seen_reviews.add(review_key)
             unique_reviews.append(review)
             
     return unique_reviews
@@ -229,7 +235,7 @@ def handle_rate_limiting(func):
 
 def save_checkpoint(data: List[Dict], filename: str = "checkpoint.json"):
     """Save progress checkpoint"""
-    import json
+    import orjson
     
     checkpoint = {
         'timestamp': datetime.now().isoformat(),
@@ -238,8 +244,8 @@ def save_checkpoint(data: List[Dict], filename: str = "checkpoint.json"):
     }
     
     try:
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(checkpoint, f, ensure_ascii=False, indent=2)
+        with open(filename, 'wb') as f:
+            f.write(orjson.dumps(checkpoint, option=orjson.OPT_INDENT_2))
         print(f"Checkpoint saved: {len(data)} reviews")
     except Exception as e:
         print(f"Failed to save checkpoint: {e}")
@@ -247,15 +253,15 @@ def save_checkpoint(data: List[Dict], filename: str = "checkpoint.json"):
 
 def load_checkpoint(filename: str = "checkpoint.json") -> List[Dict]:
     """Load progress checkpoint"""
-    import json
+    import orjson
     import os
     
     if not os.path.exists(filename):
         return []
         
     try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            checkpoint = json.load(f)
+        with open(filename, 'rb') as f:
+            checkpoint = orjson.loads(f.read())
         print(f"Checkpoint loaded: {len(checkpoint.get('data', []))} reviews")
         return checkpoint.get('data', [])
     except Exception as e: